@@ -0,0 +1,363 @@
+"""
+api.py — Headless JSON HTTP API for FinStab
+
+Serves the same analysis pipeline as the Streamlit app without a browser
+session or script reruns:
+
+    python api.py --port 8080
+    curl -s localhost:8080/v1/analyze -d '{"weekly_income": [8200, 9500, 7800, 11200],
+                                           "monthly_exp": 12000, "dependents": 2}'
+
+Endpoints (POST, JSON body; GET /healthz for liveness):
+  /v1/analyze   weekly_income, monthly_exp, dependents [, worker_type, city,
+                worker_name, insights: bool, lang_instruction]  → full analysis
+  /v1/forecast  weekly_income [, n_paths, seed]                 → p10/p50/p90 for 3 weeks
+  /v1/buffer    monthly_exp, dependents, weekly_income | avg_income → buffer plan
+  /v1/report    analyze fields [, ai_insights]                  → PDF (base64 in a batch)
+  /v1/chat      message [, chat_history, lang_instruction] and either
+                report_context or the analyze fields            → {"reply", "usage": {"prompt_tokens"}}
+
+Any endpoint also takes a batch, {"items": [payload, ...]}, answered with
+{"results": [...]} in the same order. A bad item (including amounts over
+MAX_AMOUNT or a result that is not finite) gets {"error": ...} in its slot
+instead of failing the batch. Requests are served on one thread each;
+LLM calls inside a batch fan out over a shared pool, and identical prompts
+share one Groq call through groq_helper's cache and in-flight de-duplication.
+
+Set API_TOKEN to require "Authorization: Bearer <token>" on every request.
+"""
+
+import argparse
+import base64
+import hmac
+import json
+import math
+import os
+import sys
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from groq_helper import analyze_income, chat_with_report
+from report import generate_pdf_report
+from utils import (
+    WEEKS_PER_MONTH, IncomeAnalysis, build_compact_context, calc_emergency_buffer, forecast_bands,
+)
+
+API_TOKEN       = os.getenv("API_TOKEN", "")
+API_MAX_BATCH   = int(os.getenv("API_MAX_BATCH", "500"))
+API_MAX_BODY    = int(os.getenv("API_MAX_BODY", str(4 * 1024 * 1024)))
+API_LLM_WORKERS = int(os.getenv("API_LLM_WORKERS", "8"))
+API_BACKLOG     = int(os.getenv("API_BACKLOG", "256"))
+MAX_WEEKS       = 520
+MAX_PATHS       = 20_000
+MAX_AMOUNT      = 1e9      # ₹100 crore — far above any weekly income or monthly expense
+MAX_DEPENDENTS  = 50
+MAX_SEED        = 2**32 - 1
+
+_llm_pool = ThreadPoolExecutor(max_workers=API_LLM_WORKERS, thread_name_prefix="finstab-api-llm")
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+# ─────────────────────────────────────────────────────────
+# PAYLOAD PARSING
+# ─────────────────────────────────────────────────────────
+def _number(payload: dict, key: str, default=None, lo: float = 0.0, hi: float = MAX_AMOUNT) -> float:
+    value = payload.get(key, default)
+    if value is None:
+        raise ValueError(f"'{key}' is required")
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"'{key}' must be a number") from None
+    if not math.isfinite(value) or not lo <= value <= hi:
+        raise ValueError(f"'{key}' must be a number between {lo:g} and {hi:,.0f}")
+    return value
+
+
+def _weeks(payload: dict) -> list[float]:
+    weeks = payload.get("weekly_income")
+    if not isinstance(weeks, list) or not weeks:
+        raise ValueError("'weekly_income' must be a non-empty list of numbers")
+    if len(weeks) > MAX_WEEKS:
+        raise ValueError(f"'weekly_income' is limited to {MAX_WEEKS} weeks")
+    try:
+        data = [float(v) for v in weeks]
+    except (TypeError, ValueError):
+        raise ValueError("'weekly_income' must contain only numbers") from None
+    if not all(0 <= v <= MAX_AMOUNT for v in data):   # NaN fails both comparisons
+        raise ValueError(f"'weekly_income' values must be numbers between 0 and {MAX_AMOUNT:,.0f}")
+    return data
+
+
+def _profile(payload: dict) -> tuple[str, str, str]:
+    return (str(payload.get("worker_type") or "Other Gig Work"), str(payload.get("city") or ""),
+            str(payload.get("worker_name") or ""))
+
+
+def _analysis(payload: dict) -> IncomeAnalysis:
+    return IncomeAnalysis.from_weeks(_weeks(payload), _number(payload, "monthly_exp"),
+                                     int(_number(payload, "dependents", 0, hi=MAX_DEPENDENTS)))
+
+
+def analysis_json(a: IncomeAnalysis) -> dict:
+    return {
+        "weekly_income":  list(a.weekly_income),
+        "monthly_exp":    a.monthly_exp,
+        "dependents":     a.dependents,
+        "weekly_expense": round(a.weekly_expense, 2),
+        "avg_income":     round(a.avg_income, 2),
+        "trend":          a.trend,
+        "slope":          round(a.slope, 2),
+        "deficit_weeks":  list(a.deficit_weeks),
+        "risk_score":     a.risk_score,
+        "risk_label":     a.risk_label,
+        "forecast":       {"p10": list(a.forecast_low), "p50": list(a.forecasts), "p90": list(a.forecast_high)},
+        "buffer":         {"amount": a.buffer_amount, "monthly_save": a.monthly_save, "weeks": a.buffer_weeks},
+    }
+
+
+# ─────────────────────────────────────────────────────────
+# ENDPOINTS — each takes the list of items, returns one result per item
+# ─────────────────────────────────────────────────────────
+def _each(items: list, fn) -> list:
+    """Apply fn per item; a ValueError or arithmetic error becomes that item's error entry."""
+    out = []
+    for item in items:
+        try:
+            if not isinstance(item, dict):
+                raise ValueError("each item must be a JSON object")
+            out.append(fn(item))
+        except ValueError as e:
+            out.append({"error": str(e)})
+        except ArithmeticError as e:   # overflow / division by zero in the maths
+            out.append({"error": f"cannot compute a result for these numbers ({type(e).__name__})"})
+    return out
+
+
+def _finite_only(results: list) -> list:
+    """Replace results that are not valid JSON (NaN, Infinity) with an error entry, in place."""
+    for i, res in enumerate(results):
+        try:
+            json.dumps(res, allow_nan=False)
+        except (TypeError, ValueError):
+            results[i] = {"error": "result is not a finite number; check the input amounts"}
+    return results
+
+
+def _resolve_llm(results: list):
+    """Replace pending LLM futures (under any key) with their text, in place."""
+    for res in results:
+        for key, value in list(res.items()):
+            if isinstance(value, Future):
+                res[key] = value.result()
+    return results
+
+
+def analyze(items: list) -> list:
+    def one(p):
+        a   = _analysis(p)
+        res = analysis_json(a)
+        if p.get("insights"):
+            worker_type, city, _ = _profile(p)
+            kwargs = {"lang_instruction": p["lang_instruction"]} if p.get("lang_instruction") else {}
+            res["ai_insights"] = _llm_pool.submit(analyze_income, a, worker_type, city, **kwargs)
+        return res
+    return _resolve_llm(_each(items, one))
+
+
+def forecast(items: list) -> list:
+    def one(p):
+        n_paths = int(min(MAX_PATHS, _number(p, "n_paths", 5000, lo=100, hi=math.inf)))
+        seed    = None if p.get("seed", 0) is None else int(_number(p, "seed", 0, hi=MAX_SEED))
+        return forecast_bands(_weeks(p), n_paths=n_paths, seed=seed)
+    return _each(items, one)
+
+
+def buffer(items: list) -> list:
+    def one(p):
+        weekly_expense = _number(p, "monthly_exp") / WEEKS_PER_MONTH
+        if "avg_income" in p:
+            avg = _number(p, "avg_income")
+        else:
+            weeks = _weeks(p)
+            avg   = sum(weeks) / len(weeks)
+        amount, save, weeks_n = calc_emergency_buffer(weekly_expense, avg,
+                                                      int(_number(p, "dependents", 0, hi=MAX_DEPENDENTS)))
+        return {"amount": amount, "monthly_save": save, "weeks": weeks_n}
+    return _each(items, one)
+
+
+def report(items: list) -> list:
+    def one(p):
+        a = _analysis(p)
+        worker_type, city, name = _profile(p)
+        data = generate_pdf_report(a, worker_type, city, str(p.get("ai_insights") or ""), worker_name=name)
+        kind = "application/pdf" if data[:4] == b"%PDF" else "text/plain"
+        return {"content_type": kind, "data": data}
+    return _each(items, one)
+
+
+def chat(items: list) -> list:
+    def one(p):
+        message = str(p.get("message") or "").strip()
+        if not message:
+            raise ValueError("'message' is required")
+        history = p.get("chat_history") or []
+        if not isinstance(history, list) or not all(
+                isinstance(m, dict) and m.get("role") in ("user", "assistant") and isinstance(m.get("content"), str)
+                for m in history):
+            raise ValueError("'chat_history' must be a list of {role, content} objects with string content")
+        context = p.get("report_context")
+        if context and not isinstance(context, str):
+            raise ValueError("'report_context' must be a string")
+        if not context:
+            worker_type, city, name = _profile(p)
+            context = build_compact_context(_analysis(p), worker_type, city, name)
+        if p.get("lang_instruction"):
+            context += f"\n\nIMPORTANT: {p['lang_instruction']}"
+        usage = {}   # filled with the prompt token estimate by the time the reply resolves
+        return {"reply": _llm_pool.submit(chat_with_report, str(context), history, message, usage), "usage": usage}
+    return _resolve_llm(_each(items, one))
+
+
+ENDPOINTS = {
+    "/v1/analyze":  analyze,
+    "/v1/forecast": forecast,
+    "/v1/buffer":   buffer,
+    "/v1/report":   report,
+    "/v1/chat":     chat,
+}
+
+
+# ─────────────────────────────────────────────────────────
+# HTTP
+# ─────────────────────────────────────────────────────────
+class FinStabHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    quiet = False
+
+    def log_message(self, fmt, *args):
+        if not self.quiet:
+            super().log_message(fmt, *args)
+
+    def _send(self, status: int, data: bytes, content_type: str, headers: dict | None = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_json(self, status: int, body):
+        self._send(status, json.dumps(body, ensure_ascii=False, allow_nan=False).encode("utf-8"), "application/json")
+
+    def _authorised(self) -> bool:
+        if not API_TOKEN:
+            return True
+        given = self.headers.get("Authorization", "")
+        return hmac.compare_digest(given.encode(), f"Bearer {API_TOKEN}".encode())
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/healthz":
+            self._send_json(200, {"status": "ok"})
+        else:
+            self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        try:
+            status, data, content_type = self._handle()
+        except ApiError as e:
+            status, data, content_type = e.status, self._error(str(e)), "application/json"
+        except Exception as e:  # noqa: BLE001 — never drop the connection without a reply
+            status, data, content_type = 500, self._error(f"internal error: {e}"), "application/json"
+        headers = ({"Content-Disposition": 'attachment; filename="FinStab_report.pdf"'}
+                   if content_type == "application/pdf" else None)
+        self._send(status, data, content_type, headers)
+
+    @staticmethod
+    def _error(message: str) -> bytes:
+        return json.dumps({"error": {"message": message}}, ensure_ascii=False).encode("utf-8")
+
+    def _handle(self) -> tuple[int, bytes, str]:
+        endpoint = ENDPOINTS.get(self.path.split("?", 1)[0].rstrip("/"))
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.close_connection = True
+            raise ApiError(400, "invalid Content-Length header")
+        if length > API_MAX_BODY:
+            self.close_connection = True
+            raise ApiError(413, f"request body over {API_MAX_BODY} bytes")
+        raw = self.rfile.read(length)
+        if endpoint is None:
+            raise ApiError(404, f"unknown path {self.path}")
+        if not self._authorised():
+            raise ApiError(401, "missing or invalid bearer token")
+        try:
+            body = json.loads(raw or b"{}")
+        except json.JSONDecodeError as e:
+            raise ApiError(400, f"invalid JSON: {e}") from None
+        if not isinstance(body, dict):
+            raise ApiError(400, "body must be a JSON object")
+
+        batch = "items" in body
+        items = body["items"] if batch else [body]
+        if not isinstance(items, list):
+            raise ApiError(400, "'items' must be a list")
+        if len(items) > API_MAX_BATCH:
+            raise ApiError(413, f"batch is limited to {API_MAX_BATCH} items")
+
+        results = endpoint(items)
+        if endpoint is not report:
+            _finite_only(results)
+        if not batch:
+            if "error" in results[0]:
+                raise ApiError(400, results[0]["error"])
+            if endpoint is report:  # a single report goes back as the file itself
+                return 200, results[0]["data"], results[0]["content_type"]
+        elif endpoint is report:
+            for res in results:
+                if "data" in res:
+                    res["data"] = base64.b64encode(res["data"]).decode("ascii")
+        body = {"results": results} if batch else results[0]
+        return 200, json.dumps(body, ensure_ascii=False, allow_nan=False).encode("utf-8"), "application/json"
+
+
+class FinStabServer(ThreadingHTTPServer):
+    daemon_threads     = True
+    request_queue_size = API_BACKLOG   # the stdlib default of 5 resets bursts of clients
+
+
+def make_server(host="127.0.0.1", port=8080, quiet=False) -> FinStabServer:
+    """Build (but do not start) a server; use port=0 for a free port."""
+    handler = type("Handler", (FinStabHandler,), {"quiet": quiet})
+    return FinStabServer((host, port), handler)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="FinStab JSON HTTP API.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8080)
+    ap.add_argument("--quiet", action="store_true", help="do not log each request")
+    args = ap.parse_args(argv)
+
+    server = make_server(args.host, args.port, quiet=args.quiet)
+    print(f"FinStab API on http://{args.host}:{server.server_port}", file=sys.stderr, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
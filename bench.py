@@ -0,0 +1,384 @@
+"""
+bench.py — Benchmarks and equivalence checks for FinStab
+
+    python bench.py                     # run, compare against bench_baseline.json
+    python bench.py --quick             # smaller populations, for a fast local check
+    python bench.py --update-baseline   # store this machine's timings as the baseline
+    python bench.py -k pdf              # only cases whose name contains "pdf"
+    python bench.py --import-budget 80  # cold-start budget for the input screen's own imports
+
+Every case is timed best-of-`--repeat` on fixed, seeded inputs. A case fails
+when it is more than `--threshold` × slower than its stored baseline and at
+least `--min-delta-us` microseconds slower in absolute terms, so sub-microsecond
+cases do not flap on timer noise. The PDF cases need a chart renderer
+(Kaleido + Chrome); without one they are skipped rather than timing the
+"chart unavailable" path. Before
+timing, the fast/batched paths are checked against the scalar functions they
+replace; any mismatch fails the run as well. The cold-start check renders the
+input screen in a fresh interpreter and fails if it pulls in the chart, PDF
+or LLM stack, or if the app's own modules take longer than `--import-budget`
+milliseconds to import.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from utils import (
+    FORECAST_WEIGHTS, DailyRolling, IncomeAnalysis, OnlineForecaster, build_compact_context,
+    build_report_context, calc_emergency_buffer, calc_risk_score, context_token_counts, get_forecast,
+    moving_average, rolling_daily, score_cohort, weekly_totals,
+)
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+
+POPULATIONS   = [100, 1_000, 10_000]
+HISTORIES     = [8, 52, 104]
+QUICK_POPS    = [100, 1_000]
+QUICK_HISTS   = [8, 52]
+PDF_WORKERS   = 5
+
+PDF_CASE_PREFIX   = "generate_pdf_report"
+MIN_DELTA_US      = 20.0
+
+APP_PATH          = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+IMPORT_BUDGET_MS  = 100
+INPUT_SCREEN_LAZY = ("report", "groq_helper", "llm_cache", "groq", "reportlab", "kaleido")
+
+
+def _cohort(n: int, w: int, seed: int = 0):
+    rng     = np.random.default_rng(seed)
+    base    = rng.uniform(4_000, 14_000, size=(n, 1))
+    incomes = np.round(base * rng.uniform(0.5, 1.5, size=(n, w)), -2)
+    monthly = rng.choice([8_000, 12_000, 18_000, 25_000], size=n).astype(float)
+    deps    = rng.integers(0, 7, size=n)
+    return incomes, monthly, deps
+
+
+def _best_of(fn, repeat: int, min_time: float = 0.02) -> float:
+    """Best per-call time; fast cases are looped so each sample lasts ≥ min_time."""
+    loops = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        if time.perf_counter() - t0 >= min_time or loops >= 1 << 16:
+            break
+        loops *= 2
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        best = min(best, (time.perf_counter() - t0) / loops)
+    return best
+
+
+# ─────────────────────────────────────────────────────────
+# EQUIVALENCE CHECKS — fast paths vs the scalar originals
+# ─────────────────────────────────────────────────────────
+def check_equivalence() -> list[str]:
+    failures = []
+    for w in [1, 2, 3, 4, 8, 52]:
+        incomes, monthly, deps = _cohort(2_000, w, seed=w)
+        incomes[:3] = 0.0
+        weekly = monthly / 4.33
+        batch  = score_cohort(incomes, weekly, deps)
+        for i in range(len(incomes)):
+            score, label = calc_risk_score(incomes[i], weekly[i])
+            buf, save, bw = calc_emergency_buffer(weekly[i], float(np.mean(incomes[i])), int(deps[i]))
+            got = (batch["risk_score"][i], batch["risk_label"][i], batch["buffer_amount"][i],
+                   batch["monthly_save"][i], batch["buffer_weeks"][i])
+            if got != (score, label, buf, save, bw):
+                failures.append(f"score_cohort W={w} row {i}: {got} != {(score, label, buf, save, bw)}")
+                break
+
+    for w in [1, 3, 8, 30]:
+        data = _cohort(1, w, seed=100 + w)[0][0]
+        fc   = OnlineForecaster()
+        for v in data:
+            fc.push(v)
+        np.random.seed(7)
+        expected = get_forecast(data)
+        np.random.seed(7)
+        if fc.forecast() != expected:
+            failures.append(f"OnlineForecaster W={w}: {fc.forecast()} != {expected}")
+
+    incomes, monthly, deps = _cohort(200, 8, seed=3)
+    for i in range(len(incomes)):
+        a = IncomeAnalysis.from_weeks(incomes[i], monthly[i], int(deps[i]))
+        if (a.risk_score, a.risk_label) != calc_risk_score(incomes[i], monthly[i] / 4.33):
+            failures.append(f"IncomeAnalysis row {i}: risk differs from calc_risk_score")
+            break
+
+    import datetime as dt
+    for days, start in [(5, None), (30, None), (56, None), (200, None),
+                        (11, dt.date(2026, 1, 8)), (56, dt.date(2026, 1, 5)), (75, dt.date(2026, 1, 8))]:
+        daily = np.round(_cohort(1, days, seed=200 + days)[0][0] / 7, -1)
+        daily[::9] = 0.0
+        dates = [start + dt.timedelta(days=i) for i in range(days)] if start else None
+        keep  = np.arange(days) % 13 != 6 if start else np.ones(days, bool)   # dated: some days unreported
+        daily[~keep] = 0.0
+        roll  = DailyRolling(12_000, window=28)
+        for i in np.flatnonzero(keep):
+            roll.push(daily[i], dates[i] if start else None)
+        label = f"DailyRolling days={days}{f' from {start}' if start else ''}"
+        batch = rolling_daily(daily, 28, roll.daily_expense)
+        got   = (roll.mean, roll.std, roll.volatility, roll.deficit_rate)
+        want  = tuple(batch[k][-1] for k in ("mean", "std", "volatility", "deficit_rate"))
+        weeks = weekly_totals(daily, dates)
+        if not np.allclose(got, want) or not np.isclose(roll.std, np.std(daily[-28:])):
+            failures.append(f"{label}: {got} != {want}")
+        if (len(roll.weekly) != len(weeks[-8:]) or not np.allclose(list(roll.weekly), weeks[-8:])
+                or not np.allclose(roll.forecaster.window, weeks[-len(FORECAST_WEIGHTS):])):
+            failures.append(f"{label}: weekly roll-up {list(roll.weekly)} != weekly_totals {list(weeks[-8:])}")
+        elif roll.risk() != calc_risk_score(weeks[-8:], 12_000 / 4.33):
+            failures.append(f"{label}: weekly roll-up risk differs from calc_risk_score")
+
+    span = [dt.date(2026, 1, 8) + dt.timedelta(days=i) for i in range(11)]   # Thu → Sun
+    if list(weekly_totals([100.0] * 11, span)) != [700.0] or list(weekly_totals([100.0] * 56)) != [700.0] * 8:
+        failures.append("weekly_totals: partial weeks kept or complete weeks dropped")
+
+    import pandas as pd
+    from ingest import _parse_dates
+    for label, raw in {
+        "ISO":    ["2026-01-05", "2026-01-06", "2026-01-12T09:15:00+05:30"],
+        "DD/MM":  ["05/01/2026", "06/01/2026", "12/01/2026"],
+        "mixed":  ["2026-01-05", "06/01/2026", "12 Jan 2026"],
+    }.items():
+        got = _parse_dates(pd.Series(raw), dayfirst=True).dt.strftime("%Y-%m-%d").tolist()
+        if got != ["2026-01-05", "2026-01-06", "2026-01-12"]:
+            failures.append(f"ingest dates ({label}): {raw} -> {got}")
+
+    import tempfile
+    from ingest import weekly_long
+    with tempfile.TemporaryDirectory() as tmp:
+        csv = os.path.join(tmp, "payouts.csv")
+        with open(csv, "w", encoding="utf-8") as f:
+            f.write("worker_id,date,amount\nR1,2026-01-05,500\nR1,2026-01-06,(100)\n"
+                    "R2,2026-01-05,(100)\nR2,2026-01-12,\"1,234\"\n")
+        got = weekly_long(csv).set_index(["worker_id", "week"])["amount"].to_dict()
+    if sorted(got.values()) != [0.0, 400.0, 1234.0]:
+        failures.append(f"ingest refunds: weekly totals {got}")
+
+    from report import build_income_chart, lttb_indices
+    for n in [8, 104, 730]:
+        data = np.round(_cohort(1, n, seed=300 + n)[0][0], -2)
+        keep = lttb_indices(data, 120)
+        if len(keep) != min(n, 120) or keep[0] != 0 or keep[-1] != n - 1 or np.any(np.diff(keep) <= 0):
+            failures.append(f"lttb_indices n={n}: bad selection")
+        fig  = build_income_chart(data, 9_000, float(data.mean()), float(data[-1]), _CHART_L, max_points=120)
+        bars = fig.data[1]
+        if n <= 120 and list(bars.marker.color) != list((data < 9_000).astype(int)):
+            failures.append(f"build_income_chart n={n}: deficit colours differ from per-week check")
+        if n > 120 and (bars.customdata.sum() != (data < 9_000).sum()
+                        or list(bars.marker.color) != list((bars.customdata > 0).astype(int))):
+            failures.append(f"build_income_chart n={n}: downsampled bars lose deficit weeks")
+    return failures
+
+
+# ─────────────────────────────────────────────────────────
+# COLD START — what the input screen imports, in a fresh interpreter
+# ─────────────────────────────────────────────────────────
+_COLD_START_PROBE = """
+import json, sys, time
+import streamlit
+from streamlit.testing.v1 import AppTest
+sys.path.insert(0, sys.argv[2])
+t0 = time.perf_counter()
+import perf, i18n, styles
+import_ms = (time.perf_counter() - t0) * 1e3
+t0 = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=60).run()
+print(json.dumps({
+    "import_ms": import_ms, "first_run_ms": (time.perf_counter() - t0) * 1e3,
+    "error": [str(e.value) for e in at.exception],
+    "loaded": sorted(m for m in sys.argv[3].split(",") if m in sys.modules),
+}))
+"""
+
+
+def check_cold_start(budget_ms: float) -> tuple[list[str], dict]:
+    out = subprocess.run(
+        [sys.executable, "-c", _COLD_START_PROBE, APP_PATH, os.path.dirname(APP_PATH),
+         ",".join(INPUT_SCREEN_LAZY)],
+        capture_output=True, text=True, timeout=300,
+    )
+    if out.returncode != 0:
+        return [f"cold start probe failed: {out.stderr.strip().splitlines()[-1:]}"], {}
+    res      = json.loads(out.stdout.strip().splitlines()[-1])
+    failures = [f"input screen raised: {e}" for e in res["error"]]
+    if res["loaded"]:
+        failures.append(f"input screen imported {', '.join(res['loaded'])}")
+    if res["import_ms"] > budget_ms:
+        failures.append(f"app module imports took {res['import_ms']:.1f}ms > {budget_ms:.0f}ms budget")
+    return failures, res
+
+
+# ─────────────────────────────────────────────────────────
+# TIMED CASES
+# ─────────────────────────────────────────────────────────
+def chart_renderer_error() -> str | None:
+    """None if charts can be rasterised here, else why not."""
+    try:
+        import plotly.graph_objects as go
+        from report import get_rasterizer
+        get_rasterizer().to_png(go.Figure(go.Bar(y=[1, 2])), width=40, height=20, scale=1)
+    except Exception as e:  # noqa: BLE001 — any failure means the PDFs fall back to no chart
+        return (str(e).strip().splitlines() or [type(e).__name__])[0]
+    return None
+
+
+def build_cases(pops, hists) -> dict:
+    """name → zero-argument callable."""
+    from report import lttb_indices
+
+    cases = {}
+    for n in pops:
+        for w in hists:
+            incomes, monthly, deps = _cohort(n, w)
+            weekly = monthly / 4.33
+
+            def scalar_loop(incomes=incomes, weekly=weekly):
+                for row, exp in zip(incomes, weekly):
+                    calc_risk_score(row, exp)
+
+            def forecast_loop(incomes=incomes):
+                for row in incomes:
+                    get_forecast(row)
+
+            def ma_loop(incomes=incomes):
+                for row in incomes:
+                    moving_average(row)
+
+            cases[f"calc_risk_score[N={n},W={w}]"] = scalar_loop
+            cases[f"score_cohort[N={n},W={w}]"]    = lambda i=incomes, e=weekly, d=deps: score_cohort(i, e, d)
+            cases[f"get_forecast[N={n},W={w}]"]    = forecast_loop
+            cases[f"moving_average[N={n},W={w}]"]  = ma_loop
+
+        daily = np.repeat(_cohort(n, 1)[0] / 7, 7, axis=1)
+
+        def daily_push(daily=daily):
+            for row in daily:
+                roll = DailyRolling(12_000)
+                for v in row:
+                    roll.push(v)
+
+        cases[f"DailyRolling.push[N={n},D=7]"] = daily_push
+        cases[f"rolling_daily[N={n},D=7]"]     = lambda d=daily: rolling_daily(d, 28, 12_000 / 4.33 / 7)
+
+    for w in hists:
+        incomes, monthly, deps = _cohort(PDF_WORKERS, w)
+        analyses = [IncomeAnalysis.from_weeks(incomes[i], monthly[i], int(deps[i])) for i in range(PDF_WORKERS)]
+
+        cases[f"build_report_context[W={w}]"]  = lambda a=analyses[0]: build_report_context(a, "Delivery Rider", "Mumbai")
+        cases[f"build_compact_context[W={w}]"] = lambda a=analyses[0]: build_compact_context(a, "Delivery Rider", "Mumbai")
+
+        def chart(a=analyses[0]):
+            from report import build_income_chart
+            build_income_chart(a.weekly_income, a.weekly_expense, a.avg_income, a.forecast, _CHART_L,
+                               bands=(a.forecast_low, a.forecasts, a.forecast_high))
+
+        def pdf_uncached(analyses=analyses):
+            from report import _build_pdf_report, get_rasterizer
+            get_rasterizer().clear()   # else every sample after warm-up reuses the PNGs
+            for a in analyses:
+                _build_pdf_report(a, "Delivery Rider", "Mumbai", _INSIGHTS, worker_name="Bench")
+
+        def pdf_cached(analyses=analyses):
+            from report import generate_pdf_report
+            for a in analyses:
+                generate_pdf_report(a, "Delivery Rider", "Mumbai", _INSIGHTS, worker_name="Bench")
+
+        cases[f"build_income_chart[W={w}]"]                          = chart
+        cases[f"lttb_indices[N={w * 7}]"]                            = lambda d=np.repeat(incomes[0] / 7, 7): lttb_indices(d, 120)
+        cases[f"generate_pdf_report[N={PDF_WORKERS},W={w}]"]         = pdf_uncached
+        cases[f"generate_pdf_report_cached[N={PDF_WORKERS},W={w}]"]  = pdf_cached
+    return cases
+
+
+_CHART_L = {
+    "chart_lbl_actual": "Actual Income", "chart_lbl_forecast": "Forecast",
+    "chart_lbl_expense": "Expense Line", "chart_title": "Income Overview",
+    "chart_trend": "Trend", "chart_avg": "Your Average",
+}
+_INSIGHTS = ("#### 📊 Income Pattern\nSteady with **two** dips.\n\n#### 💡 3 Tips to Stabilize\n"
+             "- Save first\n- Spread your work\n- Track daily")
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="FinStab benchmark suite")
+    ap.add_argument("--quick", action="store_true", help="smaller populations and histories")
+    ap.add_argument("-k", dest="pattern", default="", help="only run cases containing this text")
+    ap.add_argument("--repeat", type=int, default=3, help="best-of repeats per case")
+    ap.add_argument("--threshold", type=float, default=1.5, help="fail when slower than baseline × this")
+    ap.add_argument("--min-delta-us", type=float, default=MIN_DELTA_US,
+                    help="...and slower than baseline by at least this many microseconds")
+    ap.add_argument("--baseline", default=BASELINE_PATH)
+    ap.add_argument("--update-baseline", action="store_true", help="store results as the new baseline")
+    ap.add_argument("--import-budget", type=float, default=IMPORT_BUDGET_MS,
+                    help="max ms for the input screen's own module imports")
+    ap.add_argument("--skip-cold-start", action="store_true", help="skip the fresh-interpreter cold-start check")
+    args = ap.parse_args(argv)
+
+    failures = check_equivalence()
+    print(f"equivalence: {'OK' if not failures else 'FAILED'}")
+    for f in failures:
+        print(f"  ✗ {f}")
+
+    if not args.skip_cold_start:
+        cold_failures, cold = check_cold_start(args.import_budget)
+        failures += cold_failures
+        print(f"cold start: {'OK' if not cold_failures else 'FAILED'}"
+              + (f"  (app imports {cold['import_ms']:.1f}ms, first input-screen run {cold['first_run_ms']:.0f}ms)"
+                 if cold else ""))
+        for f in cold_failures:
+            print(f"  ✗ {f}")
+
+    a = IncomeAnalysis.from_weeks([8200, 9500, 7800, 11200, 6500, 10800, 9100, 12400], 12000, 2)
+    print(f"context tokens (8 weeks): {context_token_counts(a, 'Delivery Rider', 'Mumbai')}")
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+
+    pops, hists = (QUICK_POPS, QUICK_HISTS) if args.quick else (POPULATIONS, HISTORIES)
+    cases   = {k: v for k, v in build_cases(pops, hists).items() if args.pattern in k}
+    if any(k.startswith(PDF_CASE_PREFIX) for k in cases):
+        renderer_err = chart_renderer_error()
+        if renderer_err:
+            cases = {k: v for k, v in cases.items() if not k.startswith(PDF_CASE_PREFIX)}
+            print(f"PDF cases skipped: no chart renderer ({renderer_err})")
+    results = {}
+    print(f"\n{'case':<48}{'time':>12}{'baseline':>12}{'ratio':>8}")
+    for name, fn in cases.items():
+        fn()  # warm-up: imports, caches, first-call allocation
+        t = _best_of(fn, args.repeat)
+        results[name] = t
+        base  = baseline.get(name)
+        ratio = t / base if base else None
+        flag  = ""
+        if ratio is not None and ratio > args.threshold and (t - base) * 1e6 >= args.min_delta_us:
+            flag = "  ✗ regression"
+            failures.append(f"{name}: {ratio:.2f}× baseline")
+        print(f"{name:<48}{t * 1e3:>10.2f}ms"
+              f"{(f'{base * 1e3:.2f}ms' if base else '—'):>12}"
+              f"{(f'{ratio:.2f}' if ratio else '—'):>8}{flag}")
+
+    if args.update_baseline:
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as fh:
+            json.dump(dict(sorted(baseline.items())), fh, indent=2)
+        print(f"\nBaseline updated: {args.baseline}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+"""
+bulk_reports.py — Batch PDF report generation for FinStab
+
+Reads one worker per CSV row and writes one PDF per worker into a zip:
+
+    python bulk_reports.py workers.csv -o reports.zip --jobs 4
+
+CSV columns:
+  name, worker_type, city, dependents, monthly_exp  → worker profile
+  week_1 … week_N                                   → weekly incomes (any N ≥ 1; a row may
+                                                      leave its last weeks blank)
+  ai_insights (optional)                            → pre-generated insights text
+
+Reports are rendered across a process pool and streamed into the archive as
+they finish, with at most `--jobs × 2` reports in flight at once, so memory
+stays flat no matter how many rows the CSV has. A row that cannot be
+rendered (e.g. a non-numeric income, or a blank week before a filled
+one) is skipped and reported with its row
+number at the end; the other reports are still written, and the exit code
+is 1.
+"""
+
+import argparse
+import csv
+import math
+import re
+import sys
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+
+def _week_columns(fieldnames) -> list[str]:
+    cols = [c for c in fieldnames if re.fullmatch(r"week_?\d+", c.strip().lower())]
+    return sorted(cols, key=lambda c: int(re.search(r"\d+", c).group()))
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", text).strip("_")[:40] or "worker"
+
+
+def _number(row: dict, col: str, default: float = 0.0) -> float:
+    raw = (row.get(col) or "").strip()
+    if not raw:
+        return default
+    try:
+        val = float(raw.replace(",", ""))
+    except ValueError:
+        raise ValueError(f"{col} is not a number ({raw!r})") from None
+    if not math.isfinite(val):
+        raise ValueError(f"{col} is not a finite number ({raw!r})")
+    return val
+
+
+def _incomes(row: dict, week_cols: list[str]) -> list[float]:
+    """Filled week cells in order; blank weeks after the last filled one are dropped, earlier ones rejected."""
+    cells = [(row.get(c) or "").strip() for c in week_cols]
+    while cells and not cells[-1]:
+        cells.pop()
+    if not cells:
+        raise ValueError("no weekly incomes")
+    blank = [c for c, v in zip(week_cols, cells) if not v]
+    if blank:
+        raise ValueError(f"{', '.join(blank)} blank before the last filled week")
+    return [_number(row, c) for c in week_cols[:len(cells)]]
+
+
+def _render_row(job):
+    """Process-pool worker: one CSV row → (archive filename, report bytes)."""
+    idx, row, week_cols, with_ai = job
+    from groq_helper import analyze_income
+    from report import generate_pdf_report
+    from utils import IncomeAnalysis
+
+    name        = (row.get("name") or "").strip()
+    worker_type = (row.get("worker_type") or "Other Gig Work").strip()
+    city        = (row.get("city") or "").strip()
+    incomes     = _incomes(row, week_cols)
+    analysis    = IncomeAnalysis.from_weeks(
+        incomes, _number(row, "monthly_exp"), int(_number(row, "dependents")))
+
+    insights = (row.get("ai_insights") or "").strip()
+    if not insights and with_ai:
+        insights = analyze_income(analysis, worker_type=worker_type, city=city)
+
+    data = generate_pdf_report(analysis, worker_type, city, insights, worker_name=name)
+    ext  = "pdf" if data[:4] == b"%PDF" else "txt"
+    return f"{idx:05d}_{_slug(name)}.{ext}", data
+
+
+def generate_bulk_reports(csv_path: str, out_path: str, jobs: int = 4, with_ai: bool = False,
+                          progress=None) -> tuple[int, list[tuple[int, str]]]:
+    """
+    Render every row of `csv_path` into the zip at `out_path`.
+    `progress(done, name)` is called after each report is written.
+    Returns (reports written, [(row number, reason) for each failed row]);
+    row 1 is the first data row after the header.
+    """
+    done   = 0
+    failed = []
+    rows   = {}
+
+    def drain(futures):
+        nonlocal done
+        for fut in futures:
+            idx = rows.pop(fut)
+            try:
+                fname, data = fut.result()
+            except Exception as e:
+                failed.append((idx, f"{type(e).__name__}: {e}"))
+                continue
+            zf.writestr(fname, data)
+            done += 1
+            if progress:
+                progress(done, fname)
+
+    with open(csv_path, newline="", encoding="utf-8-sig") as fh, \
+         zipfile.ZipFile(out_path, "w", compression=zipfile.ZIP_DEFLATED) as zf, \
+         ProcessPoolExecutor(max_workers=jobs) as pool:
+        reader    = csv.DictReader(fh)
+        week_cols = _week_columns(reader.fieldnames or [])
+        if not week_cols:
+            raise ValueError("CSV needs week_1 … week_N income columns")
+
+        pending = set()
+        for idx, row in enumerate(reader, start=1):
+            fut = pool.submit(_render_row, (idx, row, week_cols, with_ai))
+            rows[fut] = idx
+            pending.add(fut)
+            if len(pending) >= jobs * 2:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                drain(finished)
+        drain(wait(pending).done)
+    return done, sorted(failed)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Generate one FinStab PDF report per CSV row.")
+    ap.add_argument("csv", help="input CSV of workers")
+    ap.add_argument("-o", "--out", default="FinStab_reports.zip", help="output zip archive")
+    ap.add_argument("-j", "--jobs", type=int, default=4, help="max concurrent report workers")
+    ap.add_argument("--ai", action="store_true",
+                    help="generate AI insights for rows without an ai_insights column value")
+    args = ap.parse_args(argv)
+
+    def progress(n, fname):
+        print(f"[{n}] {fname}", file=sys.stderr, flush=True)
+
+    total, failed = generate_bulk_reports(args.csv, args.out, jobs=max(1, args.jobs),
+                                          with_ai=args.ai, progress=progress)
+    print(f"Wrote {total} reports to {args.out}", file=sys.stderr)
+    if failed:
+        print(f"{len(failed)} row(s) failed:", file=sys.stderr)
+        for idx, reason in failed:
+            print(f"  row {idx}: {reason}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
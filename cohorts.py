@@ -0,0 +1,215 @@
+"""
+cohorts.py — Peer benchmarks for FinStab: how a worker compares with others
+of the same worker type in the same city
+  • QuantileSketch    → fixed-bin histogram; merge by adding counts, O(1) percentile lookup
+  • cohort_key()      → (city, worker_type) normalised across UI languages
+  • cohort_metrics()  → the benchmarked numbers of one analysis (income, volatility, risk)
+  • CohortBenchmarks  → cached per-cohort sketches read from the income store
+  • peer_benchmarks   → shared instance for the app
+
+Every metric uses the same bin edges in every cohort, so a cohort's sketch
+is just a vector of counts: storing an analysis adds 1 to one bin per metric
+(store.IncomeStore.save_analysis), and the city-wide or national picture is
+the sum of the cohort vectors. Nothing here ever scans individual analyses.
+"""
+
+import os
+import re
+import threading
+import time
+
+import numpy as np
+
+from i18n import LANG, WORKER_TYPES
+
+# Bin edges per metric. Income bins are 2% wide (log-spaced) so the error of
+# a percentile is the same for Rs.2,000 and Rs.50,000 weeks; risk scores are
+# integers and get one bin each, centred on the score.
+METRIC_BINS = {
+    "income":     np.geomspace(500.0, 100_000.0, 269),
+    "volatility": np.linspace(0.0, 2.0, 201),
+    "risk":       np.arange(-0.5, 101.0),
+}
+METRICS = tuple(METRIC_BINS)
+
+COHORT_MIN_SIZE      = int(os.getenv("COHORT_MIN_SIZE", "10"))
+COHORT_CACHE_SECONDS = float(os.getenv("COHORT_CACHE_SECONDS", "60"))
+
+
+class QuantileSketch:
+    """
+    Histogram over fixed `edges`, plus an underflow and an overflow bin.
+    Sketches with the same edges merge exactly by adding counts. A prefix
+    sum is kept after the first lookup, so percentile() is one bin search
+    over a fixed number of bins plus one index — independent of how many
+    values were added.
+    """
+    __slots__ = ("edges", "counts", "_cum")
+
+    def __init__(self, edges, counts=None):
+        self.edges  = np.asarray(edges, dtype=float)
+        self.counts = (np.zeros(len(self.edges) + 1, dtype=np.int64) if counts is None
+                       else np.asarray(counts, dtype=np.int64).copy())
+        self._cum   = None
+
+    @classmethod
+    def for_metric(cls, metric: str, counts=None) -> "QuantileSketch":
+        return cls(METRIC_BINS[metric], counts)
+
+    def bin(self, value: float) -> int:
+        return int(np.searchsorted(self.edges, value, side="right"))
+
+    def add(self, value: float, n: int = 1) -> "QuantileSketch":
+        self.counts[self.bin(value)] += n
+        self._cum = None
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("cannot merge sketches with different bin edges")
+        self.counts += other.counts
+        self._cum = None
+        return self
+
+    @property
+    def count(self) -> int:
+        return int(self.counts.sum())
+
+    def percentile(self, value: float) -> float:
+        """
+        Share of values below `value`, in percent, assuming values spread
+        evenly within a bin (half of the under/overflow bins count).
+        """
+        if self._cum is None:
+            self._cum = np.concatenate([[0], np.cumsum(self.counts)])
+        total = self._cum[-1]
+        if not total:
+            return 0.0
+        b = self.bin(value)
+        if 0 < b < len(self.edges):
+            lo, hi = self.edges[b - 1], self.edges[b]
+            frac   = (value - lo) / (hi - lo)
+        else:
+            frac = 0.5
+        return float((self._cum[b] + frac * self.counts[b]) / total * 100.0)
+
+    def quantile(self, q: float) -> float:
+        """Approximate value at quantile q ∈ [0, 1] (the lower edge of its bin)."""
+        if self._cum is None:
+            self._cum = np.concatenate([[0], np.cumsum(self.counts)])
+        total = self._cum[-1]
+        if not total:
+            return 0.0
+        b = int(np.searchsorted(self._cum[1:], q * total, side="left"))
+        return float(self.edges[min(max(b - 1, 0), len(self.edges) - 1)])
+
+
+# Each language's worker types list the same jobs in the same order
+_TYPE_INDEX = {t: i for types in WORKER_TYPES.values() for i, t in enumerate(types)}
+
+
+def cohort_key(city: str, worker_type: str) -> tuple[str, str]:
+    """(city, worker_type) with the city case/space-normalised and the type in English."""
+    city = re.sub(r"\s+", " ", (city or "").strip()).title()
+    idx  = _TYPE_INDEX.get(worker_type)
+    return city, WORKER_TYPES["English"][idx] if idx is not None else (worker_type or "").strip()
+
+
+def cohort_metrics(analysis) -> dict[str, float]:
+    """Weekly average income, volatility (std / mean of the weeks) and risk score."""
+    data = np.asarray(analysis.weekly_income, dtype=float)
+    mean = float(data.mean()) if len(data) else 0.0
+    return {
+        "income":     float(analysis.avg_income),
+        "volatility": float(data.std() / mean) if mean > 0 else 0.0,
+        "risk":       float(analysis.risk_score),
+    }
+
+
+def ordinal(n: float) -> str:
+    """31 → "31st"; percentiles are shown between 1st and 99th."""
+    n = min(99, max(1, int(round(n))))
+    suffix = "th" if 10 <= n % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
+    return f"{n}{suffix}"
+
+
+class CohortBenchmarks:
+    """
+    Per-cohort sketches loaded from an IncomeStore (default store.income_store)
+    and cached per process. A cached cohort is reloaded after this process
+    stores an analysis or after COHORT_CACHE_SECONDS, so other processes'
+    writes show up too. Loading a cohort reads its bin rows, never analyses.
+    """
+
+    def __init__(self, store=None, ttl: float = COHORT_CACHE_SECONDS):
+        self._store = store
+        self.ttl    = ttl
+        self._cache = {}
+        self._lock  = threading.Lock()
+
+    @property
+    def store(self):
+        if self._store is None:
+            from store import income_store
+            self._store = income_store
+        return self._store
+
+    def sketches(self, city: str | None, worker_type: str | None) -> dict[str, QuantileSketch]:
+        """Sketches for one cohort; None for city or worker type merges across it."""
+        key = cohort_key(city or "", worker_type or "")
+        key = (key[0] if city is not None else None, key[1] if worker_type is not None else None)
+        gen = self.store.generation
+        with self._lock:
+            hit = self._cache.get(key)
+            if hit and hit[0] == gen and time.monotonic() - hit[1] < self.ttl:
+                return hit[2]
+        counts   = self.store.cohort_counts(*key)
+        sketches = {m: QuantileSketch.for_metric(m, counts.get(m)) for m in METRICS}
+        with self._lock:
+            self._cache[key] = (gen, time.monotonic(), sketches)
+        return sketches
+
+    def percentiles(self, analysis, city: str, worker_type: str, stored: bool = False) -> dict | None:
+        """
+        Where `analysis` falls among its city × worker-type peers:
+        {"city", "worker_type", "size", "income", "volatility", "risk"} with
+        each metric as a percentile (0–100). With `stored`, the analysis has
+        already been saved into this cohort and is taken back out, so a
+        worker is never compared with themselves. None when the other
+        workers number fewer than COHORT_MIN_SIZE or the store is disabled.
+        """
+        if not self.store.enabled:
+            return None
+        values   = cohort_metrics(analysis)
+        sketches = self.sketches(city, worker_type)
+        if stored:
+            sketches = {m: QuantileSketch(sk.edges, sk.counts) for m, sk in sketches.items()}
+            for m, sk in sketches.items():
+                b = sk.bin(values[m])
+                if sk.counts[b] > 0:
+                    sk.counts[b] -= 1
+        size = sketches["risk"].count
+        if size < COHORT_MIN_SIZE:
+            return None
+        c, t = cohort_key(city, worker_type)
+        return {"city": c, "worker_type": t, "size": size,
+                **{m: round(sketches[m].percentile(values[m]), 1) for m in METRICS}}
+
+
+def peer_lines(peers: dict, L: dict | None = None, worker_type: str | None = None) -> list[str]:
+    """
+    Sentences for the results screen and PDF in the language of `L` (an
+    i18n.LANG entry; default English). `worker_type` is the type as the
+    worker chose it, shown instead of the English cohort name.
+    """
+    text = {**LANG["English"], **(L or {})}
+    pct  = {"income": peers["income"], "steady": 100 - peers["volatility"], "risk": 100 - peers["risk"]}
+    args = {k: f"{v:.0f}" for k, v in pct.items()}
+    args["rank"], args["income"] = ordinal(peers["income"]), ordinal(peers["income"])[:-2]
+    args["who"]  = text["peer_who"].format(n=peers["size"], type=worker_type or peers["worker_type"],
+                                           city=peers["city"])
+    return [text[k].format(**args) for k in ("peer_income", "peer_steady", "peer_risk")]
+
+
+# Shared instance for the Streamlit app
+peer_benchmarks = CohortBenchmarks()
@@ -0,0 +1,206 @@
+"""
+fake_groq_server.py — Local stand-in for the Groq chat completions API
+
+Speaks the OpenAI-compatible /openai/v1/chat/completions protocol (plain and
+SSE streaming) with canned replies, so the analysis and chat paths can be
+load-tested offline without spending API quota:
+
+    python fake_groq_server.py --port 8808 --latency 0.4 --token-delay 0.02 \
+        --error-rate 0.05 --rpm 300
+
+    GROQ_BASE_URL=http://127.0.0.1:8808 GROQ_API_KEY=fake streamlit run app.py
+
+  --latency      seconds before the first byte / token
+  --token-delay  seconds between streamed tokens
+  --error-rate   fraction of requests answered with HTTP 500
+  --rpm          requests per minute before answering HTTP 429 (0 = unlimited)
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ANALYSIS_REPLY = """#### 📊 Income Pattern
+Your income moves around from week to week, but your average stays above your expense target. This is a test reply from the local stand-in server.
+
+#### ⚠️ Biggest Risk
+A run of two low weeks in a row would use up your savings quickly.
+
+#### 💡 3 Tips to Stabilize
+- **Save first**: Put aside a fixed amount on your best earning day
+- **Spread your work**: Use more than one platform to smooth out slow weeks
+- **Track daily**: Write down what you earn each day for two weeks
+
+#### 🎯 This Week's Priority
+Move a small amount into your emergency fund before paying variable expenses."""
+
+CHAT_REPLY = ("Based on your report, your income is fairly steady. "
+              "Keep saving a little every week and watch for weeks that fall below your expense target. "
+              "(Reply from the local stand-in server.)")
+
+
+class FakeGroqConfig:
+    def __init__(self, latency=0.3, token_delay=0.02, error_rate=0.0, rpm=0, seed=None):
+        self.latency     = latency
+        self.token_delay = token_delay
+        self.error_rate  = error_rate
+        self.rpm         = rpm
+        self.rng         = random.Random(seed)
+        self.lock        = threading.Lock()
+        self.recent      = deque()
+        self.stats       = {"requests": 0, "errors": 0, "rate_limited": 0}
+
+    def admit(self) -> str:
+        """Decide the fate of one request: "ok", "error" or "rate_limited"."""
+        with self.lock:
+            self.stats["requests"] += 1
+            now = time.monotonic()
+            if self.rpm:
+                while self.recent and now - self.recent[0] > 60:
+                    self.recent.popleft()
+                if len(self.recent) >= self.rpm:
+                    self.stats["rate_limited"] += 1
+                    return "rate_limited"
+                self.recent.append(now)
+            if self.error_rate and self.rng.random() < self.error_rate:
+                self.stats["errors"] += 1
+                return "error"
+            return "ok"
+
+
+def _reply_for(messages: list[dict]) -> str:
+    first = messages[0]["content"] if messages else ""
+    return ANALYSIS_REPLY if "4 markdown sections" in first else CHAT_REPLY
+
+
+def _tokens(text: str) -> list[str]:
+    return re.findall(r"\s*\S+|\s+", text)
+
+
+class FakeGroqHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    config: FakeGroqConfig = None   # set by make_server()
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _send_json(self, status: int, body: dict, headers: dict | None = None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/stats"):
+            self._send_json(200, self.config.stats)
+        else:
+            self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body   = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"unknown path {self.path}"}})
+            return
+
+        cfg  = self.config
+        fate = cfg.admit()
+        if fate == "rate_limited":
+            self._send_json(429, {"error": {
+                "message": "Rate limit reached for requests (local stand-in server).",
+                "type": "requests", "code": "rate_limit_exceeded"}},
+                headers={"retry-after": "1", "x-ratelimit-limit-requests": str(cfg.rpm)})
+            return
+        time.sleep(cfg.latency)
+        if fate == "error":
+            self._send_json(500, {"error": {"message": "Injected failure (local stand-in server).",
+                                            "type": "internal_server_error"}})
+            return
+
+        model   = body.get("model", "fake-model")
+        text    = _reply_for(body.get("messages", []))
+        cid     = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        usage   = {"prompt_tokens": sum(len(m.get("content", "")) // 4 for m in body.get("messages", [])),
+                   "completion_tokens": len(_tokens(text))}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+
+        if not body.get("stream"):
+            self._send_json(200, {
+                "id": cid, "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": text}}],
+                "usage": usage,
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def event(delta, finish=None, **extra):
+            chunk = {"id": cid, "object": "chat.completion.chunk", "created": created, "model": model,
+                     "choices": [{"index": 0, "delta": delta, "finish_reason": finish}], **extra}
+            self._write_chunk(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+
+        try:
+            event({"role": "assistant", "content": ""})
+            for tok in _tokens(text):
+                event({"content": tok})
+                time.sleep(cfg.token_delay)
+            event({}, finish="stop", x_groq={"usage": usage})
+            self._write_chunk(b"data: [DONE]\n\n")
+            self._write_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def make_server(host="127.0.0.1", port=8808, **config) -> ThreadingHTTPServer:
+    """Build (but do not start) a server; use port=0 for a free port."""
+    handler = type("Handler", (FakeGroqHandler,), {"config": FakeGroqConfig(**config)})
+    server  = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Local OpenAI/Groq-compatible stand-in server.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8808)
+    ap.add_argument("--latency", type=float, default=0.3, help="seconds before the first token")
+    ap.add_argument("--token-delay", type=float, default=0.02, help="seconds between streamed tokens")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests failing with 500")
+    ap.add_argument("--rpm", type=int, default=0, help="requests/minute before 429 (0 = unlimited)")
+    ap.add_argument("--seed", type=int, default=None, help="seed for injected errors")
+    args = ap.parse_args(argv)
+
+    server = make_server(args.host, args.port, latency=args.latency, token_delay=args.token_delay,
+                         error_rate=args.error_rate, rpm=args.rpm, seed=args.seed)
+    print(f"Fake Groq API on http://{args.host}:{server.server_port}  "
+          f"(set GROQ_BASE_URL to this address)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
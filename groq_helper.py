@@ -2,12 +2,24 @@
 groq_helper.py — Groq LLaMA3 integration for FinStab
   • analyze_income()  → one-shot AI report insights
   • chat_with_report() → conversational chatbot grounded in report context
+  • *_stream() variants → same, yielded token-by-token as Groq produces them
+  • *_async() variants  → same, for asyncio callers
+  • start_insights()   → analyze_income_stream() on a background thread
 """
 
+import hashlib
 import os
-import numpy as np
+import re
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from dotenv import load_dotenv
 
+from llm_cache import ResponseCache, SingleFlight
+from utils import IncomeAnalysis, build_compact_context, estimate_tokens
+
 load_dotenv()
 
 # ─────────────────────────────────────────────────────────
@@ -16,44 +28,212 @@ load_dotenv()
 # GROQ_API_KEY = "GROQ_API_KEY"
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 MODEL        = "llama-3.1-8b-instant"
-
-
-def _get_client():
-    from groq import Groq
+# Override to target a compatible endpoint, e.g. fake_groq_server.py for offline load tests
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL") or None
+
+# Connection settings for the shared clients (seconds)
+GROQ_TIMEOUT         = float(os.getenv("GROQ_TIMEOUT", "30"))
+GROQ_CONNECT_TIMEOUT = float(os.getenv("GROQ_CONNECT_TIMEOUT", "5"))
+GROQ_MAX_RETRIES     = int(os.getenv("GROQ_MAX_RETRIES", "2"))
+GROQ_MAX_CONNECTIONS = int(os.getenv("GROQ_MAX_CONNECTIONS", "20"))
+GROQ_KEEPALIVE       = float(os.getenv("GROQ_KEEPALIVE", "60"))
+
+# Generate insights for every UI language in the background after the first
+# analysis, so switching language is instant (costs one call per language).
+PREFETCH_LANGUAGES = os.getenv("PREFETCH_LANGUAGES", "0") == "1"
+PREFETCH_WORKERS   = int(os.getenv("PREFETCH_WORKERS", "5"))
+
+# Threads generating the insights a results screen is waiting on
+INSIGHTS_WORKERS = int(os.getenv("INSIGHTS_WORKERS", "8"))
+
+# Chat prompt budget (estimated tokens) for past turns sent verbatim, and for
+# the first-sentence excerpts that older turns are cut down to
+CHAT_HISTORY_TOKENS = int(os.getenv("CHAT_HISTORY_TOKENS", "1200"))
+CHAT_EXCERPT_TOKENS = int(os.getenv("CHAT_EXCERPT_TOKENS", "300"))
+
+_client        = None
+_prefetch_pool = None
+_insights_pool = None
+_async_clients = weakref.WeakKeyDictionary()   # event loop → AsyncGroq
+_client_lock   = threading.Lock()
+
+# Completed replies, shared across sessions and processes (see llm_cache.py)
+response_cache = ResponseCache()
+_inflight      = SingleFlight()
+_ainflight     = weakref.WeakKeyDictionary()   # event loop → {key: Future}
+
+
+def _api_key() -> str:
     key = GROQ_API_KEY or os.environ.get("GROQ_API_KEY", "")
     if not key:
         raise ValueError("No Groq API key found. Set GROQ_API_KEY in groq_helper.py")
-    os.environ["GROQ_API_KEY"] = key
-    return Groq()
+    return key
+
+
+def _http_options() -> dict:
+    import httpx
+    return {
+        "timeout": httpx.Timeout(GROQ_TIMEOUT, connect=GROQ_CONNECT_TIMEOUT),
+        "limits":  httpx.Limits(max_connections=GROQ_MAX_CONNECTIONS,
+                                max_keepalive_connections=GROQ_MAX_CONNECTIONS,
+                                keepalive_expiry=GROQ_KEEPALIVE),
+    }
+
+
+def _get_client():
+    """Process-wide Groq client; its keep-alive pool is reused by every call."""
+    global _client
+    if _client is None:
+        key = _api_key()
+        with _client_lock:
+            if _client is None:
+                import httpx
+                from groq import Groq
+                opts    = _http_options()
+                _client = Groq(
+                    api_key=key, base_url=GROQ_BASE_URL,
+                    timeout=opts["timeout"], max_retries=GROQ_MAX_RETRIES,
+                    http_client=httpx.Client(**opts),
+                )
+    return _client
+
+
+def _get_async_client():
+    """
+    AsyncGroq client for the running event loop. httpx async connections
+    are tied to the loop that opened them, so there is one client per loop.
+    """
+    import asyncio
+    loop   = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        key = _api_key()
+        with _client_lock:
+            client = _async_clients.get(loop)
+            if client is None:
+                import httpx
+                from groq import AsyncGroq
+                opts   = _http_options()
+                client = AsyncGroq(
+                    api_key=key, base_url=GROQ_BASE_URL,
+                    timeout=opts["timeout"], max_retries=GROQ_MAX_RETRIES,
+                    http_client=httpx.AsyncClient(**opts),
+                )
+                _async_clients[loop] = client
+    return client
+
+
+def _text_chunks(text: str):
+    """Feed a ready-made string through the streaming interface line by line."""
+    yield from text.splitlines(keepends=True)
+
+
+def _stream_completion(messages, max_tokens, temperature, on_error):
+    """
+    Yield completion text deltas as they arrive. If the call fails before
+    any text was produced, stream `on_error(exc)` instead; if it fails
+    midway, close with a short interruption note.
+
+    Successful completions are cached on disk, and identical concurrent
+    requests wait for the first one instead of calling Groq again.
+    """
+    key  = response_cache.make_key(MODEL, max_tokens, temperature, messages)
+    text = response_cache.get(key)
+    if text is not None:
+        yield from _text_chunks(text)
+        return
+    leader, call = _inflight.begin(key)
+    if not leader:
+        text = _inflight.wait(call, timeout=GROQ_TIMEOUT * 2)
+        if text is not None:
+            yield from _text_chunks(text)
+            return
+
+    parts, result = [], None
+    try:
+        client = _get_client()
+        stream = client.chat.completions.create(
+            model=MODEL,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            stream=True,
+        )
+        for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                parts.append(delta)
+                yield delta
+        result = "".join(parts) or None
+        if result:
+            response_cache.put(key, result)
+    except Exception as e:
+        if parts:
+            yield f"\n\n⚠️ *Connection lost — this reply may be incomplete.* `{str(e)[:80]}`"
+        else:
+            yield from _text_chunks(on_error(e))
+    finally:
+        if leader:
+            _inflight.finish(key, call, result)
+
+
+async def _astream_completion(messages, max_tokens, temperature, on_error):
+    """Async counterpart of _stream_completion(), using the per-loop AsyncGroq client."""
+    import asyncio
+    key  = response_cache.make_key(MODEL, max_tokens, temperature, messages)
+    text = response_cache.get(key)
+    if text is None:
+        inflight = _ainflight.setdefault(asyncio.get_running_loop(), {})
+        pending  = inflight.get(key)
+        if pending is not None:
+            text = await asyncio.shield(pending)
+    if text is not None:
+        for piece in _text_chunks(text):
+            yield piece
+        return
+
+    future = inflight[key] = asyncio.get_running_loop().create_future()
+    parts, result = [], None
+    try:
+        client = _get_async_client()
+        stream = await client.chat.completions.create(
+            model=MODEL,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            stream=True,
+        )
+        async for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                parts.append(delta)
+                yield delta
+        result = "".join(parts) or None
+        if result:
+            response_cache.put(key, result)
+    except Exception as e:
+        if parts:
+            yield f"\n\n⚠️ *Connection lost — this reply may be incomplete.* `{str(e)[:80]}`"
+        else:
+            for piece in _text_chunks(on_error(e)):
+                yield piece
+    finally:
+        if inflight.get(key) is future:
+            del inflight[key]
+        if not future.done():
+            future.set_result(result)
 
 
 # ─────────────────────────────────────────────────────────
 # ONE-SHOT ANALYSIS
 # ─────────────────────────────────────────────────────────
-def analyze_income(
-    weekly_income, worker_type, city, dependents,
-    weekly_expense, avg_income, risk_score, risk_label,
-    forecast, lang_instruction="",
-) -> str:
-    weeks_str     = "\n".join(f"  Week {i+1}: ₹{v:,.0f}" for i, v in enumerate(weekly_income))
-    deficit_count = sum(1 for v in weekly_income if v < weekly_expense)
-
-    prompt = f"""You are a compassionate, practical financial advisor helping informal gig workers in India.
-
-Worker Profile:
-- Type: {worker_type}
-- City: {city}
-- Dependents: {dependents}
-- Weekly expense target: ₹{weekly_expense:,.0f}
+def _analysis_prompt(analysis: IncomeAnalysis, worker_type, city, lang_instruction="") -> str:
+    context = build_compact_context(analysis, worker_type, city)
 
-Income Data (last 8 weeks):
-{weeks_str}
+    return f"""You are a compassionate, practical financial advisor helping informal gig workers in India.
 
-Statistics:
-- Average weekly income: ₹{avg_income:,.0f}
-- Next week forecast: ₹{forecast:,.0f}
-- Risk Score: {risk_score}/100 ({risk_label} risk)
-- Deficit weeks: {deficit_count}/8
+Worker data:
+{context}
 
 {lang_instruction}
 
@@ -76,18 +256,107 @@ Provide a structured, warm analysis using EXACTLY these 4 markdown sections:
 Keep language simple, warm, and reference their specific numbers. Avoid jargon.
 """
 
-    try:
-        client   = _get_client()
-        response = client.chat.completions.create(
-            model=MODEL,
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=700,
-            temperature=0.7,
-        )
-        return response.choices[0].message.content
-    except Exception as e:
-        return _fallback_analysis(weekly_income, avg_income, risk_score, risk_label,
-                                  forecast, deficit_count, dependents, weekly_expense, str(e))
+
+def analyze_income(
+    analysis: IncomeAnalysis, worker_type, city, lang_instruction="",
+) -> str:
+    return "".join(analyze_income_stream(analysis, worker_type, city, lang_instruction))
+
+
+def analyze_income_stream(
+    analysis: IncomeAnalysis, worker_type, city, lang_instruction="",
+):
+    """Yield the analysis text as it is generated (offline fallback on error)."""
+    prompt = _analysis_prompt(analysis, worker_type, city, lang_instruction)
+    yield from _stream_completion(
+        [{"role": "user", "content": prompt}], max_tokens=700, temperature=0.7,
+        on_error=lambda e: _fallback_analysis(analysis, str(e)),
+    )
+
+
+async def analyze_income_async(
+    analysis: IncomeAnalysis, worker_type, city, lang_instruction="",
+) -> str:
+    """analyze_income() for asyncio callers; many can run concurrently on one loop."""
+    prompt = _analysis_prompt(analysis, worker_type, city, lang_instruction)
+    return "".join([piece async for piece in _astream_completion(
+        [{"role": "user", "content": prompt}], max_tokens=700, temperature=0.7,
+        on_error=lambda e: _fallback_analysis(analysis, str(e)),
+    )])
+
+
+def prefetch_insights(
+    analysis: IncomeAnalysis, worker_type, city, lang_instructions: dict[str, str],
+) -> dict[str, Future]:
+    """
+    Start analyze_income() for each language concurrently on a shared
+    background pool. Returns {language: Future[str]} immediately; results
+    also land in the response cache, so a later foreground call for the
+    same language is served from it (or joins the in-flight call).
+    """
+    global _prefetch_pool
+    if _prefetch_pool is None:
+        with _client_lock:
+            if _prefetch_pool is None:
+                _prefetch_pool = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS,
+                                                    thread_name_prefix="finstab-prefetch")
+    return {
+        lang: _prefetch_pool.submit(analyze_income, analysis, worker_type, city, instr)
+        for lang, instr in lang_instructions.items()
+    }
+
+
+class InsightsJob:
+    """
+    analyze_income_stream() running on a background thread. `text` is what
+    has arrived so far, so a caller can poll it and redraw; `elapsed` is the
+    wall time from start to the last chunk.
+    """
+    __slots__ = ("future", "started", "finished", "_chunks")
+
+    def __init__(self):
+        self.future   = None
+        self.started  = time.perf_counter()
+        self.finished = None
+        self._chunks  = []
+
+    def _run(self, analysis, worker_type, city, lang_instruction) -> str:
+        try:
+            for chunk in analyze_income_stream(analysis, worker_type, city, lang_instruction):
+                self._chunks.append(chunk)
+        finally:
+            self.finished = time.perf_counter()
+        return "".join(self._chunks)
+
+    @property
+    def text(self) -> str:
+        return "".join(self._chunks)
+
+    @property
+    def done(self) -> bool:
+        return self.future.done()
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    def result(self, timeout: float | None = None) -> str:
+        return self.future.result(timeout)
+
+
+def start_insights(
+    analysis: IncomeAnalysis, worker_type, city, lang_instruction="",
+) -> InsightsJob:
+    """Start generating insights without blocking; poll or wait on the returned job."""
+    global _insights_pool
+    if _insights_pool is None:
+        with _client_lock:
+            if _insights_pool is None:
+                _insights_pool = ThreadPoolExecutor(max_workers=INSIGHTS_WORKERS,
+                                                    thread_name_prefix="finstab-insights")
+    job = InsightsJob()
+    job.future = _insights_pool.submit(job._run, analysis, worker_type, city, lang_instruction)
+    return job
 
 
 # ─────────────────────────────────────────────────────────
@@ -109,10 +378,95 @@ WORKER REPORT:
 {report_context}
 """
 
+_turn_excerpts: "OrderedDict[str, str]" = OrderedDict()
+_excerpt_lock  = threading.Lock()   # shared by the API's request threads and the LLM pool
+
+
+def _excerpt_turn(msg: dict) -> str:
+    """
+    An old turn truncated to its first sentence (at most 160 characters) —
+    not a summary: anything said later in the turn is dropped. Cached by
+    content so each turn is cut once.
+    """
+    key = hashlib.sha1(f"{msg['role']}:{msg['content']}".encode("utf-8")).hexdigest()
+    with _excerpt_lock:
+        line = _turn_excerpts.get(key)
+    if line is None:
+        text  = re.sub(r"[*#>`_]+", "", msg["content"])
+        text  = re.sub(r"\s+", " ", text).strip()
+        first = re.split(r"(?<=[.!?।])\s", text, maxsplit=1)[0]
+        if len(first) > 160:
+            first = first[:157].rstrip() + "…"
+        line = f"{'User' if msg['role'] == 'user' else 'Shieldy'}: {first}"
+        with _excerpt_lock:
+            _turn_excerpts[key] = line
+            while len(_turn_excerpts) > 2048:
+                _turn_excerpts.popitem(last=False)
+    return line
+
+
+def compact_history(
+    chat_history: list[dict],
+    budget: int = CHAT_HISTORY_TOKENS,
+    excerpt_budget: int = CHAT_EXCERPT_TOKENS,
+) -> tuple[list[dict], str]:
+    """
+    Split chat history into (recent turns kept verbatim, excerpt of older turns).
+    Recent turns are taken newest-first until `budget` estimated tokens are
+    used; everything older is truncated to its first sentence, one line per
+    turn, keeping the most recent lines that fit in `excerpt_budget`.
+    """
+    recent, used = [], 0
+    for i in range(len(chat_history) - 1, -1, -1):
+        cost = estimate_tokens(chat_history[i]["content"]) + 4
+        if recent and used + cost > budget:
+            break
+        recent.append(chat_history[i])
+        used += cost
+    recent.reverse()
+    older = chat_history[:len(chat_history) - len(recent)]
+
+    lines, used = [], 0
+    for msg in reversed(older):
+        line = _excerpt_turn(msg)
+        cost = estimate_tokens(line) + 1
+        if used + cost > excerpt_budget:
+            break
+        lines.append(line)
+        used += cost
+    return recent, "\n".join(reversed(lines))
+
+
+def build_chat_messages(
+    report_context: str, chat_history: list[dict], user_message: str,
+) -> tuple[list[dict], int]:
+    """Chat request messages plus their estimated prompt token count."""
+    system_prompt   = CHATBOT_SYSTEM.format(report_context=report_context)
+    recent, excerpt = compact_history(chat_history)
+
+    messages = [{"role": "system", "content": system_prompt}]
+    if excerpt:
+        messages.append({"role": "system", "content": "Earlier conversation, first sentence of each turn only "
+                                                      f"(later details were cut):\n{excerpt}"})
+    for msg in recent:
+        messages.append({"role": msg["role"], "content": msg["content"]})
+    messages.append({"role": "user", "content": user_message})
+    return messages, sum(estimate_tokens(m["content"]) + 4 for m in messages)
+
+
+def _chat_error(e: Exception) -> str:
+    return (
+        f"⚠️ I couldn't connect to the AI service right now. Please check your Groq API key.\n\n"
+        f"Error: `{str(e)[:120]}`\n\n"
+        f"Get a free key at [console.groq.com](https://console.groq.com) and set it in `groq_helper.py`."
+    )
+
+
 def chat_with_report(
     report_context: str,
     chat_history: list[dict],
     user_message: str,
+    usage: dict | None = None,
 ) -> str:
     """
     Multi-turn chatbot grounded in the analyzed report.
@@ -121,44 +475,51 @@ def chat_with_report(
         report_context : the full plain-text report string
         chat_history   : list of {"role": "user"|"assistant", "content": "..."} dicts
         user_message   : latest user message
+        usage          : optional dict; receives "prompt_tokens", the estimated
+                         size of the prompt actually sent
 
     Returns:
         assistant reply string
     """
-    system_prompt = CHATBOT_SYSTEM.format(report_context=report_context)
+    return "".join(chat_with_report_stream(report_context, chat_history, user_message, usage))
 
-    messages = [{"role": "system", "content": system_prompt}]
-    # Include recent history (last 10 turns to stay within context)
-    for msg in chat_history[-10:]:
-        messages.append({"role": msg["role"], "content": msg["content"]})
-    messages.append({"role": "user", "content": user_message})
 
-    try:
-        client   = _get_client()
-        response = client.chat.completions.create(
-            model=MODEL,
-            messages=messages,
-            max_tokens=600,
-            temperature=0.6,
-        )
-        return response.choices[0].message.content
-    except Exception as e:
-        return (
-            f"⚠️ I couldn't connect to the AI service right now. Please check your Groq API key.\n\n"
-            f"Error: `{str(e)[:120]}`\n\n"
-            f"Get a free key at [console.groq.com](https://console.groq.com) and set it in `groq_helper.py`."
-        )
+def chat_with_report_stream(
+    report_context: str,
+    chat_history: list[dict],
+    user_message: str,
+    usage: dict | None = None,
+):
+    """Same as chat_with_report(), but yields the reply as it is generated."""
+    messages, prompt_tokens = build_chat_messages(report_context, chat_history, user_message)
+    if usage is not None:
+        usage["prompt_tokens"] = prompt_tokens
+    yield from _stream_completion(messages, max_tokens=600, temperature=0.6, on_error=_chat_error)
+
+
+async def chat_with_report_async(
+    report_context: str,
+    chat_history: list[dict],
+    user_message: str,
+    usage: dict | None = None,
+) -> str:
+    """chat_with_report() for asyncio callers."""
+    messages, prompt_tokens = build_chat_messages(report_context, chat_history, user_message)
+    if usage is not None:
+        usage["prompt_tokens"] = prompt_tokens
+    return "".join([piece async for piece in _astream_completion(
+        messages, max_tokens=600, temperature=0.6, on_error=_chat_error,
+    )])
 
 
 # ─────────────────────────────────────────────────────────
 # FALLBACK (no API key)
 # ─────────────────────────────────────────────────────────
-def _fallback_analysis(weekly_income, avg_income, risk_score, risk_label,
-                        forecast, deficit_count, dependents, weekly_expense, err="") -> str:
-    data  = np.array(weekly_income, dtype=float)
-    last4 = data[-4:]
-    slope = float(np.polyfit(range(4), last4, 1)[0]) if len(last4) == 4 else 0
-    trend = "upward 📈" if slope > 100 else ("downward 📉" if slope < -100 else "stable ➡️")
+def _fallback_analysis(analysis: IncomeAnalysis, err="") -> str:
+    avg_income    = analysis.avg_income;    forecast   = analysis.forecast
+    risk_label    = analysis.risk_label;    dependents = analysis.dependents
+    deficit_count = analysis.deficit_count
+    trend = {"upward": "upward 📈", "downward": "downward 📉", "stable": "stable ➡️"}[analysis.trend]
     save  = max(200, round(avg_income * 0.10))
 
     note = f"\n\n> ⚙️ *Running in offline mode — set `GROQ_API_KEY` in `groq_helper.py` for full AI insights.*"
@@ -0,0 +1,230 @@
+"""
+i18n.py — UI strings for FinStab
+  • LANG          → every label and prompt instruction, per language
+  • WORKER_TYPES  → worker-type choices, per language
+  • QUICK_PROMPTS → chatbot quick-question buttons, per language
+"""
+
+LANG = {
+    "English": {
+        "tagline": "Know your income. Plan your future.",
+        "sub": "Track 8 weeks of earnings, see your risk, get an AI financial plan — free.",
+        "step1": "Your Details", "step2": "Weekly Income", "step3": "Your Results",
+        "name_lbl": "Your Name",
+        "worker_lbl": "What kind of work do you do?",
+        "city_lbl": "Which city do you work in?",
+        "dep_lbl": "How many people depend on you?",
+        "exp_lbl": "Your monthly expenses (Rs.)",
+        "income_hdr": "How much did you earn each week?",
+        "income_sub": "Enter your income for each of the last 8 weeks. Estimates are fine!",
+        "analyze_btn": "Get My Financial Report",
+        "avg_lbl": "Weekly Average", "forecast_lbl": "Next Week Forecast",
+        "risk_lbl": "Risk Level", "buffer_lbl": "Safety Buffer",
+        "ai_hdr": "Your Personalized Plan",
+        "chat_hdr": "Ask Shieldy — Your AI Financial Assistant",
+        "chat_sub": "Shieldy knows your report. Ask anything — in any language!",
+        "chat_placeholder": "E.g. How can I save more? What is my risk score?",
+        "chat_send": "Send", "chat_thinking": "Shieldy is thinking...",
+        "chat_greeting": "Hello! I'm **Shieldy**, your personal finance assistant.\n\nI've read your income report and I'm ready to help. Ask me anything — about your income, savings, risk, or what to do this week!",
+        "buffer_hdr": "Your Emergency Savings Plan",
+        "fund_lbl": "Target Fund", "save_lbl": "Save Each Month", "protect_lbl": "Weeks Protected",
+        "download_lbl": "Download Full Report (PDF)",
+        "deficit_warn": "Some weeks you earned less than your expenses.",
+        "deficit_detail": "week(s) below your Rs.{exp:.0f}/week expense target.",
+        "low_risk": "LOW — You're doing well!", "med_risk": "MEDIUM — Some concern", "high_risk": "HIGH — Take action now",
+        "lang_instr": "Please respond entirely in English.",
+        "reset_btn": "Start Over",
+        "chart_lbl_actual": "Actual Income", "chart_lbl_forecast": "Forecast",
+        "chart_lbl_expense": "Expense Line", "chart_title": "Income Overview — 8 Weeks + Forecast",
+        "chart_trend": "Trend", "chart_avg": "Your Average",
+        "reanalyze_btn": "Re-analyze in", "lang_notice": "Language changed! Re-analyze to get AI insights in the new language.",
+        "load_saved_btn": "Load my saved weeks",
+        "code_lbl": "Personal code to save your history (optional, 6+ characters)", "code_help": "Only you know this code. Use the same code next time to load your saved weeks.",
+        "peer_hdr": "Compared with your peers", "peer_who": "{n:,} {type} workers in {city}",
+        "peer_income": "Your weekly income is in the {rank} percentile of {who}.",
+        "peer_steady": "Your income is steadier than {steady}% of them.", "peer_risk": "Your risk score is lower than {risk}% of them.",
+    },
+    "Hindi": {
+        "tagline": "Apni aay jaanen. Apna bhavishy banayen.",
+        "sub": "8 haftoon ki kamaai darj karen, jokhim dekhen, AI vittiya yojana paayen — muft.",
+        "step1": "Aapki Jaankaari", "step2": "Saaptaahik Aay", "step3": "Aapke Parinaam",
+        "name_lbl": "Aapka Naam",
+        "worker_lbl": "Aap kis prakar ka kaam karte hain?",
+        "city_lbl": "Aap kis shehar mein kaam karte hain?",
+        "dep_lbl": "Aap par kitne log nirbhar hain?",
+        "exp_lbl": "Aapka maasik kharcha (Rs.)",
+        "income_hdr": "Har hafte aapne kitna kamaya?",
+        "income_sub": "Pichhle 8 haftoon ki aay darj karen. Anumaan bhi theek hai!",
+        "analyze_btn": "Meri Vittiya Report Dekhen",
+        "avg_lbl": "Saaptaahik Ausath", "forecast_lbl": "Agle Hafte ka Anumaan",
+        "risk_lbl": "Jokhim Sthar", "buffer_lbl": "Suraksha Bachat",
+        "ai_hdr": "Aapki Vyaktigat Yojana",
+        "chat_hdr": "Shieldy se Puchhen — Aapka AI Vittiya Sahayak",
+        "chat_sub": "Shieldy ko aapki report pata hai. Kuchh bhi puchhen!",
+        "chat_placeholder": "Udaaharan: Main aur kaise bachat kar sakta hoon?",
+        "chat_send": "Bhejen", "chat_thinking": "Shieldy soch raha hai...",
+        "chat_greeting": "Namaste! Main **Shieldy** hoon, aapka vittiya sahayak.\n\nMainne aapki aay report padh li hai. Kuchh bhi puchhen!",
+        "buffer_hdr": "Aapki Aapatkaleen Bachat Yojana",
+        "fund_lbl": "Lakshya Raashi", "save_lbl": "Har Maheene Bachayen", "protect_lbl": "Surakshit Saptaah",
+        "download_lbl": "Poori Report Download Karen (PDF)",
+        "deficit_warn": "Kuchh hafte aapki kamaai kharche se kam rahi.",
+        "deficit_detail": "hafte aapke Rs.{exp:.0f}/saptaah ke lakshya se kam rahe.",
+        "low_risk": "Kam — Achha hai!", "med_risk": "Madhyam — Dhyan den", "high_risk": "Uchch — Abhi kadam uthayen",
+        "lang_instr": "Please respond entirely in Hindi language. Use simple, warm language suitable for gig workers.",
+        "reset_btn": "Phir se Shuroo Karen",
+        "chart_lbl_actual": "Vaastvik Aay", "chart_lbl_forecast": "Anumaan",
+        "chart_lbl_expense": "Kharcha Rekha", "chart_title": "8 Haftoon ki Aay",
+        "chart_trend": "Rukh", "chart_avg": "Aapka Ausath",
+        "reanalyze_btn": "Phir se Vishleshan Karen", "lang_notice": "Bhaasha badal gayi! Nayi bhaasha mein insights ke liye Re-analyze karen.",
+        "load_saved_btn": "Mere save kiye hafte load karen",
+        "code_lbl": "History save karne ke liye apna code (optional, 6+ akshar)", "code_help": "Yeh code sirf aap jaante hain. Agli baar wahi code daalein.",
+        "peer_hdr": "Aapke saathiyon se tulna", "peer_who": "{city} ke {n:,} {type} workers",
+        "peer_income": "Aapki saptahik kamaai {who} mein {income}ve percentile par hai.",
+        "peer_steady": "Aapki kamaai unmein se {steady}% se zyada sthir hai.", "peer_risk": "Aapka jokhim score unmein se {risk}% se kam hai.",
+    },
+    "Marathi": {
+        "tagline": "Tumchi kamaai jaana. Bhavishy ghadva.",
+        "sub": "8 aaThavdyaanchi kamaai naondva, jokheema paha, AI yojana milva — mophata.",
+        "step1": "Tumchi Maahiti", "step2": "Saaptaahik Utpanna", "step3": "Tumche Nikaal",
+        "name_lbl": "Tumche Naav",
+        "worker_lbl": "Tumhi konatyaa prakarache kaam karta?",
+        "city_lbl": "Tumhi konatyaa sheharat kaam karta?",
+        "dep_lbl": "Tumchyavar kiti jan avalaamboon aahet?",
+        "exp_lbl": "Tumcha maasik kharcha (Rs.)",
+        "income_hdr": "Dar aaThavdyaat tumhi kiti kamavale?",
+        "income_sub": "Maageel 8 aaThavdyaanche utpanna naondva. Andaajaane Theek aahe!",
+        "analyze_btn": "Maazha Arthik Ahavaal Pahaa",
+        "avg_lbl": "Saaptaahik Saraasar", "forecast_lbl": "Pudheel aaThavdyaachaa Andaaja",
+        "risk_lbl": "Jokheema Paatali", "buffer_lbl": "Suraksha Bachat",
+        "ai_hdr": "Tumchi Vaiyakteeka Yojana",
+        "chat_hdr": "Shieldy la Vichaara — AI Arthik Sahaayyak",
+        "chat_sub": "Shieldy la tumcha ahavaal maahit aahe. Kaahee hi vichaara!",
+        "chat_placeholder": "Udaa. Mi adhik bachat kashe karu?",
+        "chat_send": "Paatthava", "chat_thinking": "Shieldy vichar karat aahe...",
+        "chat_greeting": "Namaskar! Mi **Shieldy** aahe, tumcha Arthik sahaayyak.\n\nTumcha ahavaal vaachala aahe. Kaahee hi vichaara!",
+        "buffer_hdr": "Tumchi AaNeebaaNee Bachat Yojana",
+        "fund_lbl": "Lakshy Nidhi", "save_lbl": "Darmaahaa Bachat", "protect_lbl": "Surakshit aaThavde",
+        "download_lbl": "Sampoornn Ahavaal Download Karaa (PDF)",
+        "deficit_warn": "Kaahi aaThavde utpanna kharchaapekshaa kami hote.",
+        "deficit_detail": "aaThavde Rs.{exp:.0f}/aaThavdaa pekshaa kami.",
+        "low_risk": "Kami — Chhaann!", "med_risk": "Madhyam — Lakshy dyaa", "high_risk": "Jaast — Aattaa karaavaai karaa",
+        "lang_instr": "Please respond entirely in Marathi language. Use simple, warm Marathi.",
+        "reset_btn": "Punhaa Suruu Karaa",
+        "chart_lbl_actual": "Vaastaveek Utpanna", "chart_lbl_forecast": "Andaaja",
+        "chart_lbl_expense": "Kharcha Reshaa", "chart_title": "8 aaThavdyaanche Utpanna",
+        "chart_trend": "Kl", "chart_avg": "Saraasar",
+        "reanalyze_btn": "Punhaa Vishleshan Karaa", "lang_notice": "Bhaashaa badali! Navyaa bhaashet insights saaThee Re-analyze karaa.",
+        "load_saved_btn": "Maazhe save kelele aaThavde load karaa",
+        "code_lbl": "History save karnyasaathi tumcha code (optional, 6+ akshare)", "code_help": "Ha code fakt tumhala maahit aahe. Pudhchya veli haach code vaapra.",
+        "peer_hdr": "Tumchya sahkaryanshi tulna", "peer_who": "{city} madhil {n:,} {type} workers",
+        "peer_income": "Tumchi saptahik kamaai {who} madhye {income}vya percentile madhye aahe.",
+        "peer_steady": "Tumchi kamaai tyanchyapaiki {steady}% peksha jaast sthir aahe.", "peer_risk": "Tumcha jokheem score tyanchyapaiki {risk}% peksha kami aahe.",
+    },
+    "Tamil": {
+        "tagline": "Ungal varumanam ariyungal. Ethirkaalam tittamidungal.",
+        "sub": "8 vaarangalin sambaatiyathai padivu seyyungal, AI tittam perungal — ilavacam.",
+        "step1": "Ungal Vivaragal", "step2": "Vaaraantira Varumanam", "step3": "Ungal Mudivugal",
+        "name_lbl": "Ungal Peyar",
+        "worker_lbl": "Neengal enna velai seygireerkal?",
+        "city_lbl": "Neengal enda nagarattil panipurikirgal?",
+        "dep_lbl": "Ungalai saarntiruppavar ettanai peer?",
+        "exp_lbl": "Ungal maadumaantira selavu (Rs.)",
+        "income_hdr": "Ovvoru vaaramum evvalavu sambaadittirkal?",
+        "income_sub": "Kadanta 8 vaarangalin varumaanattai ulliidungal. Tooraayamana togaiyum sari!",
+        "analyze_btn": "En Nidhi Arikkaiyai Paarungal",
+        "avg_lbl": "Vaaraantira Saraasar", "forecast_lbl": "Adutta Vaar Mugankanipu",
+        "risk_lbl": "Aapattu Nilai", "buffer_lbl": "Paadukaapu Cemippu",
+        "ai_hdr": "Ungal Tanippattu Tittam",
+        "chat_hdr": "Shieldy-yidam Keelungal — AI Nidhi Utaviyaalar",
+        "chat_sub": "Ungal arikkai Shieldy-ku theriyum. Eduvaiyum keelungal!",
+        "chat_placeholder": "Utaa. Naan eppadiyum cemippalaam?",
+        "chat_send": "Anuppu", "chat_thinking": "Shieldy yosikkiraar...",
+        "chat_greeting": "Vanakkam! Naan **Shieldy**, ungal nidhi utaviyaalar.\n\nUngal arikkaiyai padittean. Etuvaiyum keelungal!",
+        "buffer_hdr": "Ungal Avasarakaala Cemippu Tittam",
+        "fund_lbl": "Ilakku Nidhi", "save_lbl": "Maadumaantira Cemippu", "protect_lbl": "Paadukaapu Vaarangal",
+        "download_lbl": "Muzhu Arikkaiyai Padiviraakkavum (PDF)",
+        "deficit_warn": "Sila vaarangal varumanam selavai vida kuiraavaaga iruntadu.",
+        "deficit_detail": "vaarangal Rs.{exp:.0f}/vaarattirku keele.",
+        "low_risk": "Kurai — Nalladu!", "med_risk": "Naduttaram — Kavanang", "high_risk": "Adhikam — Udanadi nadavadikkai",
+        "lang_instr": "Please respond entirely in Tamil language. Use simple, warm Tamil language suitable for gig workers.",
+        "reset_btn": "Meendum Tudanghu",
+        "chart_lbl_actual": "Unmaiyaan Varumanam", "chart_lbl_forecast": "Mugankanipu",
+        "chart_lbl_expense": "Selavu Vari", "chart_title": "8 Vaarangalin Varumanam",
+        "chart_trend": "Pokkku", "chart_avg": "Saraasar",
+        "reanalyze_btn": "Meendum Paguppaayvu", "lang_notice": "Mozhi maari! Pudiya mozhiyil insights perya Re-analyze seyyungal.",
+        "load_saved_btn": "En saemitha vaarangalai load seyyungal",
+        "code_lbl": "Varalaaru saemikka ungal code (viruppam, 6+ ezhuthukkal)", "code_help": "Intha code ungalukku mattume theriyum. Adutha murai athe code-ai payanpadutthungal.",
+        "peer_hdr": "Ungal sagaakkaludan oppeedu", "peer_who": "{city}-il ulla {n:,} {type} thozhilaalargal",
+        "peer_income": "Ungal vaara varumaanam {who} idaiye {income}-vathu percentile-il ullathu.",
+        "peer_steady": "Ungal varumaanam avargalil {steady}% perai vida nilaiyaanathu.", "peer_risk": "Ungal aapatthu mathippeedu avargalil {risk}% perai vida kuraivu.",
+    },
+    "Bengali": {
+        "tagline": "Aay janun. Bhabishyat garun.",
+        "sub": "8 saptaher aay likhun, jhunki dekhun, AI parikolpana pan — binamuulye.",
+        "step1": "Aapnar Tottho", "step2": "Saptahik Aay", "step3": "Aapnar Phalaaphal",
+        "name_lbl": "Aapnar Naam",
+        "worker_lbl": "Aapni ki dharaner kaj koren?",
+        "city_lbl": "Aapni kon shahare kaj koren?",
+        "dep_lbl": "Aapnar upor kotojoner nirbharshilata ache?",
+        "exp_lbl": "Aapnar maasik kharch (Rs.)",
+        "income_hdr": "Prati saptahe koto aay korechen?",
+        "income_sub": "Gato 8 saptaher aay likhun. Anumani holeo cholbe!",
+        "analyze_btn": "Aamar Aarthik Protibedon Dekhun",
+        "avg_lbl": "Saptahik Gord", "forecast_lbl": "Porer Saptaher Purbhaas",
+        "risk_lbl": "Jhunkir Matra", "buffer_lbl": "Suroksha Sonchoy",
+        "ai_hdr": "Aapnar Byaktigat Parikolpana",
+        "chat_hdr": "Shieldy-ke Jiggesh Korun — AI Aarthik Sahakari",
+        "chat_sub": "Shieldy aapnar protibedon jane. Jekono bhashay jiggesh korun!",
+        "chat_placeholder": "Jemon: Aami kibhabe aro sonchoy korbo?",
+        "chat_send": "Pathaan", "chat_thinking": "Shieldy bhabchhe...",
+        "chat_greeting": "Nomoshkar! Aami **Shieldy**, aapnar aarthik sahakari.\n\nAapnar protibedon porechi. Jekono proshno korun!",
+        "buffer_hdr": "Aapnar Joruri Sonchoy Parikolpana",
+        "fund_lbl": "Lakkha Tahobil", "save_lbl": "Maasik Sonchoy", "protect_lbl": "Surokkhit Saptah",
+        "download_lbl": "Sampurna Protibedon Download Korun (PDF)",
+        "deficit_warn": "Kichhu saptah aay khorcheyr cheye kom chilo.",
+        "deficit_detail": "saptah Rs.{exp:.0f}/saptaher niche.",
+        "low_risk": "Kom — Bhalo!", "med_risk": "Madhyom — Sotokor thakun", "high_risk": "Beshi — Ekhoni podokkhep nin",
+        "lang_instr": "Please respond entirely in Bengali language. Use simple, warm Bengali.",
+        "reset_btn": "Aabar Shuru Korun",
+        "chart_lbl_actual": "Bastob Aay", "chart_lbl_forecast": "Purbhaas",
+        "chart_lbl_expense": "Khorcheyr Rekha", "chart_title": "8 Saptaher Aay",
+        "chart_trend": "Dharaa", "chart_avg": "Gordo",
+        "reanalyze_btn": "Punoray Bishleshhon Korun", "lang_notice": "Bhaasha paltecho! Notun bhaashay insights-er jonno Re-analyze korun.",
+        "load_saved_btn": "Aamar save kora saptaho load korun",
+        "code_lbl": "History save korar jonno apnar code (optional, 6+ okkhor)", "code_help": "Ei code shudhu apni janen. Porer bar eki code din.",
+        "peer_hdr": "Apnar shohokormider shathe tulona", "peer_who": "{city}-er {n:,} jon {type} kormi",
+        "peer_income": "Apnar saptahik aay {who}-er moddhe {income}-tomo percentile-e.",
+        "peer_steady": "Apnar aay tader {steady}% er cheye beshi sthir.", "peer_risk": "Apnar jhunki score tader {risk}% er cheye kom.",
+    },
+}
+
+WORKER_TYPES = {
+    "English":  ["Delivery Rider (Food / Parcel)", "Ride-sharing Driver (Ola / Uber)", "Freelancer / Online Work", "Daily Wage / Construction", "Street Vendor / Shop Helper", "Domestic / Household Worker", "Warehouse / Logistics", "Other Gig Work"],
+    "Hindi":    ["Delivery Rider", "Ride-sharing Driver", "Freelancer / Online kaam", "Daily Maazdoor / Nirmaann", "Street Vendor", "Gharelu Kaamgaar", "Warehouse / Logistics", "Anya Gig Kaam"],
+    "Marathi":  ["Delivery Rider", "Ride-sharing Driver", "Freelancer / Online kaam", "Danik Mazdoor", "Pheriwala", "Gharguti Kaamgaar", "Warehouse / Logistics", "Itar Gig kaam"],
+    "Tamil":    ["Delivery Rider", "Ride-sharing Driver", "Freelancer", "Dinak kooli thozhilaalar", "Theru Vitrpanaiyaalar", "Veetu Veelaiyaal", "Warehouse / Logistics", "Mattra Kig Velai"],
+    "Bengali":  ["Delivery Rider", "Ride-sharing Driver", "Freelancer / Online kaj", "Dainik Mazdoor", "Pheri Bikreta", "Grihosthali Kormi", "Warehouse / Logistics", "Onyanyo Gig kaj"],
+}
+
+WEEK_DEFAULTS = [8200, 9500, 7800, 11200, 6500, 10800, 9100, 12400]
+LANG_OPTIONS  = list(LANG.keys())
+
+QUICK_PROMPTS = {
+    "English":  ["What is my biggest financial risk?", "How can I save more?", "Explain my risk score", "What should I do this week?"],
+    "Hindi":    ["Mera sabse bada jokhim kya hai?", "Main aur bachat kaise karun?", "Is hafte kya karun?", "Mera jokhim score samjhayen"],
+    "Marathi":  ["Maazha sarvat motha dhoka konata?", "Mi adhik bachat kashi karu?", "Ya aaThavdyat kay karu?", "Jokheema score samjava"],
+    "Tamil":    ["En miga periya aapatthu enna?", "Naan eppadiyum cemikkalaam?", "Inta vaaram enna seyyalaam?", "Aapatthu mativeen vilakkungal"],
+    "Bengali":  ["Aamar shobbcheye boro jhunki ki?", "Aami kibhabe aro sonchoy korbo?", "Ei saptahe ki korbo?", "Jhunki score bujhiye din"],
+}
+
+
+_GREETING_WORDS = ["Hello!", "Namaste!", "Namaskar!", "Vanakkam!", "Nomoshkar!"]
+
+
+def personal_greeting(L: dict, worker_name: str = "") -> str:
+    """The chatbot's opening message, addressed by name when one was given."""
+    greeting = L["chat_greeting"]
+    if worker_name.strip():
+        for word in _GREETING_WORDS:
+            greeting = greeting.replace(word, f"{word[:-1]}, {worker_name}!")
+    return greeting
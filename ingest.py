@@ -0,0 +1,268 @@
+"""
+ingest.py — Gig-platform payout exports → weekly income series for FinStab
+
+Reads daily (or per-trip) payout exports from delivery and ride-hailing
+platforms and totals them per worker per ISO week (Monday start):
+
+    python ingest.py swiggy.csv uber.csv --weeks 8                   # risk summary per worker
+    python ingest.py exports/*.csv -o weekly.csv --store             # also save into store.py's database
+
+CSV files are streamed in chunks of --chunk-rows rows, so exports larger
+than memory are fine; Excel files (.xlsx/.xls, needs openpyxl) are read
+whole. Columns are matched by common names (see COLUMN_ALIASES); a file
+without a platform column is labelled with its file name, and a worker
+paid by several platforms gets one row per platform per week. Refunds and
+reversals (negative amounts) offset pay inside their week, but a week never
+totals below zero.
+
+    weekly_long()    → DataFrame[worker_id, platform, week, amount]
+    weekly_matrix()  → workers × weeks totals, unpaid weeks inside a worker's span = 0
+    worker_series()  → {worker_id: weekly totals} for calc_risk_score / get_forecast
+    score_inputs()   → (worker_ids, incomes) ready for utils.score_cohort
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+CHUNK_ROWS = 200_000
+
+# Accepted column names per field, compared case-insensitively after
+# stripping spaces/underscores/dashes
+COLUMN_ALIASES = {
+    "worker_id": ["worker_id", "worker", "partner_id", "driver_id", "rider_id", "delivery_partner_id",
+                  "de_id", "user_id", "phone", "mobile"],
+    "date":      ["date", "payout_date", "trip_date", "order_date", "txn_date", "transaction_date",
+                  "settlement_date", "day", "timestamp", "datetime"],
+    "amount":    ["amount", "payout", "net_payout", "earnings", "net_earnings", "total_earnings",
+                  "total_payout", "payout_amount", "amount_inr", "credit"],
+    "platform":  ["platform", "source", "app", "aggregator"],
+}
+
+_EXCEL_EXTS = (".xlsx", ".xlsm", ".xls")
+
+
+def _squash(name: str) -> str:
+    return "".join(ch for ch in str(name).lower() if ch.isalnum())
+
+
+def resolve_columns(columns, overrides: dict | None = None) -> dict[str, str]:
+    """Map field → actual column name; raises ValueError if a required field is missing."""
+    by_key  = {_squash(c): c for c in columns}
+    mapping = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        if overrides and overrides.get(field):
+            mapping[field] = overrides[field]
+            continue
+        for alias in aliases:
+            if _squash(alias) in by_key:
+                mapping[field] = by_key[_squash(alias)]
+                break
+    missing = [f for f in ("worker_id", "date", "amount") if f not in mapping]
+    if missing:
+        raise ValueError(f"no column for {', '.join(missing)} (columns: {', '.join(map(str, columns))})")
+    return mapping
+
+
+def _to_amount(col: pd.Series) -> pd.Series:
+    """Numbers, with currency symbols, thousands separators and (1,234) negatives handled."""
+    if pd.api.types.is_numeric_dtype(col):
+        return col.astype(float)
+    out = pd.to_numeric(col, errors="coerce")
+    bad = out.isna() & col.notna()
+    if bad.any():   # only formatted values pay for the string clean-up
+        text = col[bad].astype(str).str.strip()
+        neg  = text.str.startswith("(") & text.str.endswith(")")
+        text = text.str.replace(r"(?i)\b(?:rs|inr)\.?|[^0-9.\-]", "", regex=True)
+        val  = pd.to_numeric(text, errors="coerce")
+        out[bad] = val.where(~neg, -val.abs())
+    return out.astype(float)
+
+
+def _parse_dates(raw: pd.Series, dayfirst: bool) -> pd.Series:
+    """
+    Dates → midnight timestamps. A daily export repeats the same few hundred
+    dates across millions of rows, so only the distinct values are parsed.
+    ISO values (YYYY-MM-DD…) are parsed as ISO whatever `dayfirst` says;
+    `dayfirst` applies to the rest, one inferred format vectorized, with
+    values it rejects (exports that mix formats) retried one by one.
+    """
+    codes, uniq = pd.factorize(raw)
+    uniq = pd.Series(uniq, dtype=object)
+    text = uniq.astype(str).str.strip()
+    iso  = text.str.match(r"\d{4}-\d{1,2}-\d{1,2}")
+    day  = pd.Series(pd.NaT, index=uniq.index, dtype="datetime64[ns]")
+    if iso.any():
+        local    = text[iso].str.replace(r"(?:Z|[+-]\d{2}:?\d{2})$", "", regex=True)   # keep the local date
+        day[iso] = pd.to_datetime(local, errors="coerce", format="ISO8601")
+    rest = ~iso
+    if rest.any():
+        day[rest] = pd.to_datetime(text[rest], errors="coerce", dayfirst=dayfirst)
+        bad = rest & day.isna()
+        if bad.any():
+            day[bad] = pd.to_datetime(text[bad], errors="coerce", dayfirst=dayfirst, format="mixed")
+    day = day.dt.normalize().to_numpy(dtype="datetime64[ns]")
+    out = np.where(codes >= 0, day[np.maximum(codes, 0)] if len(day) else np.datetime64("NaT"),
+                   np.datetime64("NaT"))
+    return pd.Series(out, index=raw.index)
+
+
+def _weekly_chunk(df: pd.DataFrame, cols: dict[str, str], platform: str, dayfirst: bool) -> pd.Series:
+    """One chunk → amount summed per (worker_id, platform, week)."""
+    day  = _parse_dates(df[cols["date"]], dayfirst)
+    week = day - pd.to_timedelta(day.dt.weekday, unit="D")
+    frame = pd.DataFrame({
+        "worker_id": df[cols["worker_id"]].astype(str).str.strip(),
+        "platform":  (df[cols["platform"]].astype(str).str.strip() if "platform" in cols
+                      else pd.Series(platform, index=df.index)),
+        "week":      week,
+        "amount":    _to_amount(df[cols["amount"]]),
+    }).dropna(subset=["week", "amount"])
+    return frame.groupby(["worker_id", "platform", "week"], sort=False)["amount"].sum()
+
+
+def _read_chunks(path: str, chunk_rows: int):
+    if path.lower().endswith(_EXCEL_EXTS):
+        yield pd.read_excel(path, dtype=object)
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_rows, dtype=str, encoding="utf-8-sig",
+                               skipinitialspace=True)
+
+
+def weekly_long(
+    paths, platform: str | None = None, columns: dict | None = None,
+    dayfirst: bool = True, chunk_rows: int = CHUNK_ROWS,
+) -> pd.DataFrame:
+    """
+    Stream every export in `paths` and total payouts per worker, platform
+    and ISO week. `platform` labels files without a platform column
+    (default: the file name); `columns` overrides column detection, e.g.
+    {"amount": "Net Pay"}. Indian exports write dates day-first, hence the
+    default. Returns a DataFrame sorted by worker_id, week, platform.
+    """
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+    partial = []
+    pending = 0
+    for path in paths:
+        label = platform or os.path.splitext(os.path.basename(path))[0]
+        cols  = None
+        for chunk in _read_chunks(str(path), chunk_rows):
+            if cols is None:
+                cols = resolve_columns(chunk.columns, columns)
+            partial.append(_weekly_chunk(chunk, cols, label, dayfirst))
+            pending += len(chunk)
+            # Fold the per-chunk sums together now and then so memory tracks
+            # the number of worker-weeks, not the number of input rows
+            if len(partial) > 1 and pending >= chunk_rows * 8:
+                partial, pending = [pd.concat(partial).groupby(level=[0, 1, 2], sort=False).sum()], 0
+    if not partial:
+        return pd.DataFrame({"worker_id": pd.Series(dtype=str), "platform": pd.Series(dtype=str),
+                             "week": pd.Series(dtype="datetime64[ns]"), "amount": pd.Series(dtype=float)})
+    total = pd.concat(partial).groupby(level=[0, 1, 2], sort=False).sum()
+    out   = total.clip(lower=0.0).rename("amount").reset_index()   # a refund-only week is 0 income
+    return out.sort_values(["worker_id", "week", "platform"], ignore_index=True)
+
+
+def weekly_matrix(weekly: pd.DataFrame, last: int | None = None) -> pd.DataFrame:
+    """
+    Workers × consecutive weeks of income summed over platforms. Between a
+    worker's first and last paid week, a week with no payouts counts as 0.0;
+    weeks before or after that span are NaN. With `last`, keep only the most
+    recent `last` weeks.
+    """
+    if weekly.empty:
+        return pd.DataFrame(dtype=float)
+    totals = weekly.pivot_table(index="worker_id", columns="week", values="amount", aggfunc="sum")
+    span   = pd.date_range(totals.columns.min(), totals.columns.max(), freq="7D")
+    arr    = totals.reindex(columns=span).to_numpy(dtype=float)
+    paid   = ~np.isnan(arr)
+    cols   = np.arange(arr.shape[1])
+    first  = paid.argmax(axis=1)
+    final  = arr.shape[1] - 1 - paid[:, ::-1].argmax(axis=1)
+    inside = (cols >= first[:, None]) & (cols <= final[:, None])
+    arr    = np.where(inside & ~paid, 0.0, arr)
+    out    = pd.DataFrame(arr, index=totals.index, columns=span)
+    return out.iloc[:, -last:] if last else out
+
+
+def worker_series(weekly: pd.DataFrame) -> dict[str, np.ndarray]:
+    """Each worker's own weekly totals, first to last paid week — a calc_risk_score / get_forecast input."""
+    matrix = weekly_matrix(weekly)
+    return {wid: row[~np.isnan(row)] for wid, row in zip(matrix.index, matrix.to_numpy())}
+
+
+def score_inputs(weekly: pd.DataFrame, last: int = 8) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (worker_ids, incomes) for utils.score_cohort: an (N × last) matrix of the
+    most recent `last` weeks, for workers paid across that whole window
+    (score the others from worker_series()). Each row is also a valid
+    calc_risk_score / get_forecast input on its own.
+    """
+    matrix = weekly_matrix(weekly, last=last)
+    full   = matrix.notna().all(axis=1).to_numpy()
+    return matrix.index.to_numpy()[full], matrix.to_numpy(dtype=float)[full]
+
+
+def to_store(weekly: pd.DataFrame, store=None) -> tuple[int, int]:
+    """
+    Bulk-upsert the per-platform weekly rows into an IncomeStore (default:
+    store.income_store). Platform ids (often phone numbers) are never stored:
+    each is hashed with store.worker_key, so a worker finds their history in
+    the app by entering that id as their personal code. Returns (rows
+    written, workers skipped because their id is shorter than
+    store.MIN_CODE_LENGTH).
+    """
+    from store import worker_key
+    if store is None:
+        from store import income_store as store
+    keys = {wid: worker_key(str(wid)) for wid in weekly["worker_id"].unique()}
+    ids  = weekly["worker_id"].map(keys)
+    keep = ids.notna()
+    rows = zip(ids[keep], weekly["week"][keep].dt.strftime("%Y-%m-%d"),
+               weekly["amount"][keep].astype(float), weekly["platform"][keep])
+    return store.upsert_weeks(rows), sum(k is None for k in keys.values())
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Turn platform payout exports into weekly income series.")
+    ap.add_argument("files", nargs="+", help="CSV or Excel payout exports")
+    ap.add_argument("--platform", help="platform label for files without a platform column")
+    ap.add_argument("--weeks", type=int, default=8, help="weeks used for the risk summary")
+    ap.add_argument("--monthly-exp", type=float, default=12000, help="monthly expenses assumed for the summary")
+    ap.add_argument("--month-first", action="store_true", help="dates are MM/DD rather than DD/MM")
+    ap.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    ap.add_argument("-o", "--out", help="write the long weekly table to this CSV")
+    ap.add_argument("--store", nargs="?", metavar="DB", help="save the weekly rows into this income store database "
+                    "(default: INCOME_DB_PATH, else .cache/finstab.sqlite)",
+                    const="")
+    args = ap.parse_args(argv)
+
+    weekly = weekly_long(args.files, platform=args.platform, dayfirst=not args.month_first,
+                         chunk_rows=args.chunk_rows)
+    print(f"{weekly['worker_id'].nunique()} workers, {len(weekly)} worker-platform-weeks, "
+          f"{weekly['platform'].nunique()} platforms", file=sys.stderr)
+    if args.out:
+        weekly.to_csv(args.out, index=False, date_format="%Y-%m-%d")
+    if args.store is not None:
+        from store import DEFAULT_DB_PATH, INCOME_DB_PATH, IncomeStore
+        path = args.store or INCOME_DB_PATH or DEFAULT_DB_PATH
+        written, skipped = to_store(weekly, IncomeStore(path))
+        print(f"stored {written} rows in {path}", file=sys.stderr)
+        if skipped:
+            print(f"skipped {skipped} workers whose id is too short to use as a personal code", file=sys.stderr)
+
+    from utils import WEEKS_PER_MONTH, score_cohort
+    ids, incomes = score_inputs(weekly, last=args.weeks)
+    if len(ids):
+        scores = score_cohort(incomes, args.monthly_exp / WEEKS_PER_MONTH, 0)
+        for wid, avg, score, label in zip(ids, scores["avg_income"], scores["risk_score"], scores["risk_label"]):
+            print(f"{wid}\tavg={avg:,.0f}\trisk={score} {label}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+"""
+llm_cache.py — Response de-duplication for FinStab's Groq calls
+  • ResponseCache → disk-backed (SQLite) completion cache with TTL + size eviction
+  • SingleFlight  → concurrent identical requests share one in-flight call
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+_DEFAULT_PATH         = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "llm.sqlite")
+LLM_CACHE_PATH        = os.getenv("LLM_CACHE_PATH", _DEFAULT_PATH)
+LLM_CACHE_TTL         = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+
+
+def _normalise(text: str) -> str:
+    """Collapse whitespace so cosmetic differences map to the same key."""
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class ResponseCache:
+    """
+    Completion text keyed on a hash of (model, sampling params, normalised
+    messages). Entries expire after `ttl` seconds; beyond `max_entries` the
+    least recently read are dropped. An empty `path` disables the cache.
+    SQLite keeps it safe to share between threads and worker processes.
+    """
+
+    def __init__(self, path: str = LLM_CACHE_PATH, ttl: float = LLM_CACHE_TTL,
+                 max_entries: int = LLM_CACHE_MAX_ENTRIES):
+        self.path        = path
+        self.ttl         = ttl
+        self.max_entries = max_entries
+        self._ready      = False
+        self._lock       = threading.Lock()
+
+    @staticmethod
+    def make_key(model: str, max_tokens: int, temperature: float, messages: list[dict]) -> str:
+        payload = json.dumps(
+            [model, max_tokens, temperature,
+             [[m["role"], _normalise(m["content"])] for m in messages]],
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5)
+        if not self._ready:
+            with self._lock:
+                if not self._ready:
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS responses ("
+                        " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                        " created REAL NOT NULL, accessed REAL NOT NULL)")
+                    conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed)")
+                    conn.commit()
+                    self._ready = True
+        return conn
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def get(self, key: str) -> str | None:
+        if not self.enabled:
+            return None
+        try:
+            conn = self._connect()
+            try:
+                now = time.time()
+                row = conn.execute(
+                    "SELECT value FROM responses WHERE key = ? AND created >= ?",
+                    (key, now - self.ttl)).fetchone()
+                if row is None:
+                    return None
+                conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+                conn.commit()
+                return row[0]
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return None
+
+    def put(self, key: str, value: str):
+        if not self.enabled:
+            return
+        try:
+            conn = self._connect()
+            try:
+                now = time.time()
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                    (key, value, now, now))
+                conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+                conn.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    " SELECT key FROM responses ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,))
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            pass  # a cache write failure should never break a reply
+
+    def clear(self):
+        if not self.enabled or not os.path.exists(self.path):
+            return
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM responses")
+            conn.commit()
+        finally:
+            conn.close()
+
+
+class _Call:
+    __slots__ = ("event", "value")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+
+
+class SingleFlight:
+    """
+    Lets the first caller for a key do the work while identical concurrent
+    callers wait for its result. begin() returns (is_leader, call); the
+    leader must always call finish(), passing None if it failed so waiters
+    fall back to making their own call.
+    """
+
+    def __init__(self):
+        self._lock  = threading.Lock()
+        self._calls: dict[str, _Call] = {}
+
+    def begin(self, key: str) -> tuple[bool, _Call]:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                return False, call
+            call = self._calls[key] = _Call()
+            return True, call
+
+    def wait(self, call: _Call, timeout: float | None = None):
+        call.event.wait(timeout)
+        return call.value
+
+    def finish(self, key: str, call: _Call, value):
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+        call.value = value
+        call.event.set()
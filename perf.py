@@ -0,0 +1,197 @@
+"""
+perf.py — Per-rerun timing and profiling for the FinStab Streamlit app
+  • RerunTimer.stage()  → wall-clock time of one named stage of a script run
+  • RerunTimer.stream() → same for a streamed LLM reply, plus time to first chunk
+  • RerunTimer.meta     → other per-run numbers for the log line, e.g. prompt token counts
+  • begin_rerun()       → one timer per script run, kept in st.session_state
+  • summarize()         → per-stage count / mean / p95 / max over recent runs
+
+Every finished run is kept in st.session_state["perf_history"] (the last
+PERF_HISTORY runs of the session, always on) and shown summarised in the
+debug panel. Writing each run as one JSON line to the "finstab.perf" logger
+is optional:
+
+    PERF_LOG=perf.jsonl streamlit run app.py     # append to a file ("-" = stderr)
+    PERF_PANEL=1 streamlit run app.py            # show the debug panel (or open ?debug=1)
+    PERF_PROFILE=1 streamlit run app.py          # also capture cProfile + tracemalloc per run
+
+Profiles land in PERF_PROFILE_DIR as <run>.prof (open with `python -m pstats`
+or snakeviz) and <run>.tracemalloc (tracemalloc.Snapshot.load).
+"""
+
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+import uuid
+from collections import deque
+from contextlib import contextmanager
+
+PERF_PANEL       = os.getenv("PERF_PANEL", "0") == "1"
+PERF_LOG         = os.getenv("PERF_LOG", "")
+PERF_PROFILE     = os.getenv("PERF_PROFILE", "0") == "1"
+PERF_PROFILE_DIR = os.getenv("PERF_PROFILE_DIR",
+                             os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "profiles"))
+PERF_HISTORY     = int(os.getenv("PERF_HISTORY", "50"))
+PERF_TOP_N       = 12
+
+logger = logging.getLogger("finstab.perf")
+logger.setLevel(logging.INFO)
+logger.propagate = False
+if PERF_LOG:
+    _handler = logging.StreamHandler(sys.stderr) if PERF_LOG == "-" else logging.FileHandler(PERF_LOG, encoding="utf-8")
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+
+
+class RerunTimer:
+    """
+    Collects stage timings for one script run. Stages may nest or repeat; a
+    repeated name accumulates. A stage interrupted by an exception (including
+    Streamlit's st.rerun()) is still recorded. With `profile=True` the run is
+    also traced with cProfile and tracemalloc until finish().
+    """
+
+    def __init__(self, screen: str = "", profile: bool = False):
+        self.run_id   = uuid.uuid4().hex[:12]
+        self.screen   = screen
+        self.started  = time.time()
+        self.t0       = time.perf_counter()
+        self.stages: dict[str, float] = {}
+        self.counts: dict[str, int]   = {}
+        self.extra: dict[str, float]  = {}
+        self.meta: dict               = {}
+        self.record: dict | None      = None
+        self.details: dict            = {}
+        self._profiler  = None
+        self._snapshot0 = None
+        if profile:
+            self._start_profile()
+
+    # ── stages ──
+    def add(self, name: str, seconds: float):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    @contextmanager
+    def stage(self, name: str):
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - t)
+
+    def stream(self, name: str, chunks):
+        """Pass `chunks` through, timing the whole stream and its first chunk."""
+        t     = time.perf_counter()
+        first = True
+        try:
+            for chunk in chunks:
+                if first:
+                    self.extra[f"{name}.first_chunk"] = round((time.perf_counter() - t) * 1e3, 2)
+                    first = False
+                yield chunk
+        finally:
+            self.add(name, time.perf_counter() - t)
+
+    # ── profiling ──
+    def _start_profile(self):
+        try:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        except ValueError:
+            self._profiler = None   # another session's profiler is active
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+        self._snapshot0 = tracemalloc.take_snapshot()
+
+    def _stop_profile(self) -> dict:
+        out = {}
+        os.makedirs(PERF_PROFILE_DIR, exist_ok=True)
+        base = os.path.join(PERF_PROFILE_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{self.run_id}")
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._profiler.dump_stats(base + ".prof")
+            buf = io.StringIO()
+            pstats.Stats(self._profiler, stream=buf).sort_stats("cumulative").print_stats(PERF_TOP_N)
+            out["profile_path"] = base + ".prof"
+            out["profile_top"]  = buf.getvalue()
+        snap = tracemalloc.take_snapshot()
+        snap.dump(base + ".tracemalloc")
+        current, peak = tracemalloc.get_traced_memory()
+        out["tracemalloc_path"] = base + ".tracemalloc"
+        out["mem_current_kb"]   = round(current / 1024, 1)
+        out["mem_peak_kb"]      = round(peak / 1024, 1)
+        out["alloc_top"]        = [str(s) for s in snap.compare_to(self._snapshot0, "lineno")[:PERF_TOP_N]]
+        tracemalloc.reset_peak()
+        return out
+
+    # ── result ──
+    def elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self.t0) * 1e3, 2)
+
+    def snapshot(self) -> dict:
+        """Timings so far, in milliseconds, without ending the run."""
+        return {
+            "run_id": self.run_id, "screen": self.screen, "ts": round(self.started, 3),
+            "total_ms": self.elapsed_ms(),
+            "stages_ms": {k: round(v * 1e3, 2) for k, v in self.stages.items()},
+            "calls": dict(self.counts), **({"extra_ms": dict(self.extra)} if self.extra else {}),
+            **({"meta": dict(self.meta)} if self.meta else {}),
+        }
+
+    def finish(self, interrupted: bool = False) -> dict:
+        """End the run once: log the JSON line and stop profiling. Idempotent."""
+        if self.record is not None:
+            return self.record
+        rec = self.snapshot()
+        if interrupted:
+            rec["interrupted"] = True
+        if self._snapshot0 is not None:
+            prof = self._stop_profile()
+            rec["profile"] = {k: v for k, v in prof.items() if k not in ("profile_top", "alloc_top")}
+            self.details = prof
+        self.record = rec
+        if logger.handlers:
+            logger.info(json.dumps(rec, ensure_ascii=False))
+        return rec
+
+
+def begin_rerun(session_state, screen: str = "") -> RerunTimer:
+    """
+    Start timing a script run. A run cut short by st.rerun() never reaches
+    finish(), so the previous timer is finished here (marked interrupted);
+    its record and profile summary are kept in session_state for the panel,
+    and the record joins session_state["perf_history"].
+    """
+    prev = session_state.get("perf_timer")
+    if prev is not None:
+        session_state["perf_last"]    = prev.finish(interrupted=prev.record is None)
+        session_state["perf_details"] = prev.details
+        history = session_state.get("perf_history")
+        if history is None:
+            history = session_state["perf_history"] = deque(maxlen=PERF_HISTORY)
+        history.append(session_state["perf_last"])
+    timer = RerunTimer(screen=screen, profile=PERF_PROFILE)
+    session_state["perf_timer"] = timer
+    return timer
+
+
+def summarize(records) -> list[dict]:
+    """Per-stage timings over run records (plus "total"), slowest mean first."""
+    by_stage: dict[str, list[float]] = {}
+    for rec in records:
+        by_stage.setdefault("total", []).append(rec["total_ms"])
+        for name, ms in rec["stages_ms"].items():
+            by_stage.setdefault(name, []).append(ms)
+    rows = []
+    for name, values in by_stage.items():
+        values = sorted(values)
+        rows.append({"stage": name, "runs": len(values), "mean_ms": round(sum(values) / len(values), 2),
+                     "p95_ms": values[min(len(values) - 1, int(0.95 * len(values)))], "max_ms": values[-1]})
+    return sorted(rows, key=lambda r: -r["mean_ms"])
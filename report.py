@@ -0,0 +1,676 @@
+"""
+report.py — Income chart and PDF report builders for FinStab
+  • build_income_chart()  → Plotly figure for the results screen and PDF
+  • lttb_indices()        → Largest-Triangle-Three-Buckets sample of a long history
+  • generate_pdf_report() → ReportLab PDF bytes, cached per unique report
+"""
+
+import atexit
+import hashlib
+import io
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from utils import IncomeAnalysis, moving_average
+
+
+# ══════════════════════════════════════════════════════════
+# DOWNSAMPLING
+# ══════════════════════════════════════════════════════════
+# Histories longer than this are drawn from an LTTB sample of this many
+# points; bar value labels and trend markers are only drawn up to LABEL_MAX_POINTS
+CHART_MAX_POINTS = int(os.getenv("CHART_MAX_POINTS", "120"))
+LABEL_MAX_POINTS = 16
+PDF_TABLE_WEEKS  = 16
+
+
+def lttb_indices(y, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: indices of `n_out` points (always the
+    first and last) whose polyline best keeps the shape of `y` — each bucket
+    keeps the point forming the largest triangle with the previously kept
+    point and the next bucket's mean, so peaks and dips survive. One numpy
+    pass per bucket; returns every index when `y` is already short enough.
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x     = np.arange(n, dtype=float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)   # n_out - 2 middle buckets
+    keep  = np.empty(n_out, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        if b + 2 < n_out - 1:
+            nxt_x, nxt_y = x[hi:edges[b + 2]].mean(), y[hi:edges[b + 2]].mean()
+        else:
+            nxt_x, nxt_y = x[-1], y[-1]
+        area = np.abs((x[a] - nxt_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (nxt_y - y[a]))
+        a = keep[b + 1] = lo + int(area.argmax())
+    return keep
+
+
+# ══════════════════════════════════════════════════════════
+# IMPROVED CHART BUILDER
+# ══════════════════════════════════════════════════════════
+def build_income_chart(weekly_income, weekly_expense, avg_income, forecast, L, for_pdf=False, bands=None,
+                       max_points=None, period="W"):
+    """
+    Income bars against the expense target, trend, forecast and the
+    period-on-period change for a history of any length. `bands` =
+    (p10, p50, p90) lists for the periods after the history; without it
+    only the next period's point forecast is drawn. Above `max_points`
+    (default CHART_MAX_POINTS) the history is LTTB-downsampled; a kept bar
+    is red when any period it stands for was below the expense target.
+    `period` prefixes the x labels ("W" for weeks, "D" for days).
+    """
+    data   = np.asarray(weekly_income, dtype=float)
+    n      = len(data)
+    ma     = moving_average(data)
+    keep   = lttb_indices(data, max_points or CHART_MAX_POINTS)
+    sparse = len(keep) < n
+    short  = len(keep) <= LABEL_MAX_POINTS
+
+    # Each kept point stands for the periods nearer to it than to its neighbours
+    below   = data < weekly_expense
+    starts  = np.concatenate([[0], (keep[:-1] + keep[1:]) // 2 + 1]) if n else keep
+    n_below = np.add.reduceat(below.astype(int), starts) if n else np.zeros(0, dtype=int)
+    deficit = n_below > 0
+    shown   = data[keep]
+    weeks_x = np.char.add(period, (keep + 1).astype(str)).tolist()
+
+    C_BLUE      = "#2563EB"
+    C_BLUE_SOFT = "#60A5FA"
+    C_GREEN     = "#16A34A"
+    C_GREEN_LT  = "rgba(22,163,74,0.15)"
+    C_RED       = "#DC2626"
+    C_RED_LT    = "rgba(220,38,38,0.13)"
+    C_AMBER     = "#D97706"
+    C_GREY      = "#6B7A9B"
+    C_GREY_LT   = "rgba(107,122,155,0.15)"
+    C_BG        = "white" if for_pdf else "rgba(0,0,0,0)"
+    C_GRID      = "#EEF2F8"
+
+    fig = make_subplots(
+        rows=2, cols=1,
+        row_heights=[0.72, 0.28],
+        shared_xaxes=True,
+        vertical_spacing=0.06,
+        subplot_titles=("", f"{period}-on-{period} Change (Rs.)" if not sparse else "Change (Rs.)")
+    )
+
+    # Colours as 0/1 arrays on two-stop scales: one byte per bar in the payload
+    def two_tone(on_zero, on_one):
+        return dict(colorscale=[[0, on_zero], [1, on_one]], cmin=0, cmax=1)
+
+    # Shaded area under trend
+    fig.add_trace(go.Scatter(
+        x=weeks_x + weeks_x[::-1],
+        y=np.concatenate([ma[keep], np.zeros(len(keep))]),
+        fill="toself",
+        fillcolor=C_GREY_LT,
+        line=dict(width=0),
+        showlegend=False,
+        hoverinfo="skip",
+    ), row=1, col=1)
+
+    # Bars
+    fig.add_trace(go.Bar(
+        x=weeks_x,
+        y=shown,
+        name=L["chart_lbl_actual"],
+        marker=dict(
+            color=deficit.astype(np.int8), **two_tone("rgba(22,163,74,0.18)", "rgba(220,38,38,0.18)"),
+            line=dict(color=deficit.astype(np.int8), **two_tone(C_GREEN, C_RED), width=2 if short else 1),
+        ),
+        text=[f"Rs.{v:,.0f}" for v in shown] if short else None,
+        textposition="outside",
+        textfont=dict(size=10, color=C_GREY, family="Outfit"),
+        customdata=n_below if sparse else None,
+        hovertemplate=(
+            "<b>%{x}</b><br>"
+            "Income: <b>Rs.%{y:,.0f}</b><br>"
+            f"vs Expense: Rs.{weekly_expense:,.0f}<br>"
+            + ("Below target nearby: %{customdata}<br>" if sparse else "")
+            + "<extra></extra>"
+        ),
+    ), row=1, col=1)
+
+    # Forecast bars (median with p10–p90 band when available)
+    if bands is not None:
+        f_low, f_mid, f_high = (np.asarray(b, dtype=float) for b in bands)
+    else:
+        f_low = f_mid = f_high = np.array([forecast], dtype=float)
+    f_x = [f"{period}{n + i + 1}" for i in range(len(f_mid))]
+    fig.add_trace(go.Bar(
+        x=f_x,
+        y=f_mid,
+        name=L["chart_lbl_forecast"],
+        marker=dict(
+            color="rgba(37,99,235,0.18)",
+            line=dict(color=C_BLUE, width=2),
+            pattern=dict(shape="/", fgcolor=C_BLUE, size=6),
+        ),
+        error_y=dict(
+            type="data", symmetric=False, color=C_BLUE, thickness=1.5, width=6,
+            array=f_high - f_mid,
+            arrayminus=f_mid - f_low,
+            visible=bands is not None,
+        ),
+        text=[f"Rs.{v:,.0f}" for v in f_mid],
+        textposition="outside",
+        textfont=dict(size=10, color=C_BLUE, family="Outfit"),
+        customdata=np.column_stack([f_low, f_high]),
+        hovertemplate=(
+            "<b>Forecast %{x}</b><br>Rs.%{y:,.0f}<br>"
+            "Likely range: Rs.%{customdata[0]:,.0f} – Rs.%{customdata[1]:,.0f}<extra></extra>"
+        ),
+    ), row=1, col=1)
+
+    # Trend line
+    fig.add_trace(go.Scatter(
+        x=weeks_x,
+        y=ma[keep],
+        mode="lines+markers" if short else "lines",
+        name=L["chart_trend"],
+        line=dict(color=C_GREY, width=2.5 if short else 1.5, dash="dot"),
+        marker=dict(size=5, color=C_GREY, symbol="circle"),
+        hovertemplate="Trend: Rs.%{y:,.0f}<extra></extra>",
+    ), row=1, col=1)
+
+    # Average line
+    fig.add_hline(
+        y=avg_income, line_color=C_BLUE_SOFT, line_dash="dash", line_width=1.5,
+        annotation_text=f"  {L['chart_avg']}: Rs.{avg_income:,.0f}",
+        annotation_font=dict(color=C_BLUE_SOFT, size=11, family="Outfit"),
+        annotation_position="top left",
+        row=1, col=1,
+    )
+
+    # Expense line
+    fig.add_hline(
+        y=weekly_expense, line_color=C_AMBER, line_dash="dash", line_width=1.8,
+        annotation_text=f"  {L['chart_lbl_expense']}: Rs.{weekly_expense:,.0f}",
+        annotation_font=dict(color=C_AMBER, size=11, family="Outfit"),
+        annotation_position="bottom left",
+        row=1, col=1,
+    )
+
+    y_max = max(shown.max(initial=0.0), f_high.max(initial=0.0)) * 1.22
+
+    # Green zone above expense
+    fig.add_hrect(
+        y0=weekly_expense, y1=y_max,
+        fillcolor=C_GREEN_LT, layer="below", line_width=0,
+        row=1, col=1,
+    )
+    # Red zone below expense
+    fig.add_hrect(
+        y0=0, y1=weekly_expense,
+        fillcolor=C_RED_LT, layer="below", line_width=0,
+        row=1, col=1,
+    )
+
+    # Change panel: between consecutive bars as drawn (adjacent periods unless downsampled)
+    deltas = np.diff(shown, prepend=shown[:1])
+    down   = (deltas < 0).astype(np.int8)
+    fig.add_trace(go.Bar(
+        x=weeks_x,
+        y=deltas,
+        name="WoW Change",
+        marker=dict(
+            color=down, **two_tone("rgba(22,163,74,0.25)", "rgba(220,38,38,0.25)"),
+            line=dict(color=down, **two_tone(C_GREEN, C_RED), width=1.5 if short else 1),
+        ),
+        text=[f"+{d:,.0f}" if d > 0 else (f"{d:,.0f}" if d < 0 else "–") for d in deltas] if short else None,
+        textposition="outside",
+        textfont=dict(size=9, color=[C_RED if d else C_GREEN for d in down] if short else C_GREY, family="Outfit"),
+        hovertemplate=f"{'WoW' if period == 'W' and not sparse else 'Change'}: Rs.%{{y:+,.0f}}<extra></extra>",
+        showlegend=False,
+    ), row=2, col=1)
+
+    fig.add_hline(y=0, line_color=C_GREY, line_width=1, row=2, col=1)
+
+    fig.update_layout(
+        paper_bgcolor=C_BG,
+        plot_bgcolor=C_BG,
+        font=dict(family="Outfit, sans-serif", color=C_GREY, size=12),
+        legend=dict(
+            bgcolor="rgba(255,255,255,0.85)",
+            bordercolor="#DDE4EF",
+            borderwidth=1,
+            orientation="h",
+            x=0, y=1.07,
+            font=dict(size=12, family="Outfit"),
+        ),
+        margin=dict(l=8, r=8, t=48, b=8) if not for_pdf else dict(l=40, r=40, t=48, b=40),
+        height=400 if not for_pdf else 360,
+        barmode="overlay",
+        hovermode="x unified",
+        hoverlabel=dict(
+            bgcolor="white",
+            bordercolor="#DDE4EF",
+            font=dict(family="Outfit", size=12, color="#1A2035"),
+        ),
+    )
+
+    axis_style = dict(
+        gridcolor=C_GRID,
+        linecolor="#DDE4EF",
+        tickfont=dict(family="Outfit", size=11, color=C_GREY),
+        showgrid=True,
+        zeroline=False,
+    )
+    fig.update_xaxes(**axis_style)
+    fig.update_yaxes(**axis_style)
+    fig.update_yaxes(tickprefix="Rs.", row=1, col=1, range=[0, y_max])
+    fig.update_yaxes(tickprefix="Rs.", row=2, col=1)
+    fig.update_xaxes(showticklabels=True, row=2, col=1)
+    fig.update_annotations(font=dict(size=11, color=C_GREY, family="Outfit"))
+
+    return fig
+
+
+# ══════════════════════════════════════════════════════════
+# CHART RASTERISER
+# ══════════════════════════════════════════════════════════
+class ChartRasterizer:
+    """
+    Process-wide PNG renderer for Plotly figures.
+    After the first successful render it starts Kaleido's persistent browser
+    server (Kaleido ≥ 1.0; older Kaleido keeps its own long-lived scope), so
+    later renders skip browser start-up. Starting only after a render has
+    worked keeps a missing Chrome an ordinary exception rather than a dead
+    server thread. Rendered PNGs are kept in an LRU keyed on the figure
+    JSON and output size, so identical charts are never rasterised twice.
+    """
+
+    def __init__(self, cache_size: int = 128):
+        self.cache_size   = cache_size
+        self._cache       = OrderedDict()
+        self._lock        = threading.Lock()
+        self._render_lock = threading.Lock()
+        self._server      = False
+        self._started     = False
+
+    def start(self):
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        try:
+            import kaleido
+            if hasattr(kaleido, "start_sync_server"):
+                kaleido.start_sync_server(silence_warnings=True)
+                self._server = True
+                atexit.register(self.close)
+        except Exception:
+            pass  # plotly.io.to_image falls back to one-shot rendering
+
+    def close(self):
+        with self._lock:
+            if not self._server:
+                return
+            self._server = False
+        try:
+            import kaleido
+            kaleido.stop_sync_server(silence_warnings=True)
+        except Exception:
+            pass
+
+    def clear(self):
+        """Drop every cached PNG (the next render of each chart rasterises again)."""
+        with self._lock:
+            self._cache.clear()
+
+    def to_png(self, fig, width: int, height: int, scale: float = 2) -> bytes:
+        key = hashlib.sha256(f"{fig.to_json()}|{width}x{height}@{scale}".encode("utf-8")).hexdigest()
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        from plotly.io import to_image
+        with self._render_lock:
+            png = to_image(fig, format="png", width=width, height=height, scale=scale)
+        self.start()
+
+        with self._lock:
+            self._cache[key] = png
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return png
+
+
+_rasterizer: ChartRasterizer | None = None
+
+
+def get_rasterizer() -> ChartRasterizer:
+    """The shared ChartRasterizer for this process."""
+    global _rasterizer
+    if _rasterizer is None:
+        _rasterizer = ChartRasterizer()
+    return _rasterizer
+
+
+# ══════════════════════════════════════════════════════════
+# PDF GENERATION
+# ══════════════════════════════════════════════════════════
+def _build_pdf_report(analysis, worker_type, city, ai_insights, worker_name="", L=None, peers=None):
+    """(report bytes, whether the chart was drawn into them); bytes are text if ReportLab fails."""
+    if L is None:
+        L = {
+            "chart_lbl_actual": "Actual Income",
+            "chart_lbl_forecast": "Forecast",
+            "chart_lbl_expense": "Expense Line",
+            "chart_title": "Income Overview",
+            "chart_trend": "Trend",
+            "chart_avg": "Your Average",
+        }
+
+    try:
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.lib.units import cm
+        from reportlab.lib.colors import HexColor, white
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, HRFlowable, Image as RLImage
+        from reportlab.lib.enums import TA_CENTER, TA_LEFT
+
+        def safe(t):
+            return (t or "").encode("ascii", "replace").decode("ascii")
+
+        buf = io.BytesIO()
+        doc = SimpleDocTemplate(buf, pagesize=A4,
+            rightMargin=1.8 * cm, leftMargin=1.8 * cm, topMargin=2 * cm, bottomMargin=2 * cm)
+
+        BLUE    = HexColor("#2563EB"); BLUE_LT = HexColor("#EEF3FE")
+        GREEN   = HexColor("#16A34A"); AMBER   = HexColor("#D97706")
+        RED     = HexColor("#DC2626"); GREY    = HexColor("#6B7A9B")
+        LIGHT   = HexColor("#F7F9FC"); BORDER  = HexColor("#DDE4EF")
+        DARK    = HexColor("#1A2035")
+
+        risk_color = {"LOW": GREEN, "MEDIUM": AMBER, "HIGH": RED}[analysis.risk_label]
+        risk_icon  = {"LOW": "LOW [OK]", "MEDIUM": "MEDIUM [!]", "HIGH": "HIGH [!!!]"}[analysis.risk_label]
+        styles = getSampleStyleSheet()
+        pw = A4[0] - 3.6 * cm
+
+        def sty(name, **kw):
+            return ParagraphStyle(name, parent=styles["Normal"], **kw)
+
+        story = []
+        weekly_income  = analysis.weekly_income
+        weekly_expense = analysis.weekly_expense
+        avg   = analysis.avg_income;    fcast  = analysis.forecast
+        rscore = analysis.risk_score;   bamt   = analysis.buffer_amount
+        msave  = analysis.monthly_save; bwks   = analysis.buffer_weeks
+
+        # ── Header ──
+        header_content = [
+            [Paragraph("FinStab", sty("T", fontSize=20, fontName="Helvetica-Bold", textColor=white, alignment=TA_CENTER))],
+            [Paragraph("Your Financial Report", sty("S", fontSize=10, fontName="Helvetica", textColor=white, alignment=TA_CENTER))],
+        ]
+        if worker_name:
+            header_content.append(
+                [Paragraph(f"Prepared for: {safe(worker_name)}", sty("N", fontSize=11, fontName="Helvetica", textColor=white, alignment=TA_CENTER))]
+            )
+        hdr = Table(header_content, colWidths=[pw])
+        hdr.setStyle(TableStyle([("BACKGROUND", (0, 0), (-1, -1), BLUE), ("TOPPADDING", (0, 0), (-1, -1), 16), ("BOTTOMPADDING", (0, 0), (-1, -1), 14)]))
+        story += [hdr, Spacer(1, 0.4 * cm)]
+
+        # ── KPIs ──
+        kpi = Table([
+            [Paragraph(f"Rs.{avg:,.0f}",   sty("KV",  fontSize=17, fontName="Helvetica-Bold", textColor=BLUE,       alignment=TA_CENTER)),
+             Paragraph(f"Rs.{fcast:,.0f}", sty("KV2", fontSize=17, fontName="Helvetica-Bold", textColor=BLUE,       alignment=TA_CENTER)),
+             Paragraph(f"{rscore}/100",    sty("KV3", fontSize=17, fontName="Helvetica-Bold", textColor=risk_color, alignment=TA_CENTER)),
+             Paragraph(f"Rs.{bamt:,.0f}",  sty("KV4", fontSize=17, fontName="Helvetica-Bold", textColor=BLUE,       alignment=TA_CENTER))],
+            [Paragraph("Weekly Average",   sty("KL",  fontSize=9,  fontName="Helvetica", textColor=GREY, alignment=TA_CENTER)),
+             Paragraph("Forecast",         sty("KL2", fontSize=9,  fontName="Helvetica", textColor=GREY, alignment=TA_CENTER)),
+             Paragraph("Risk Score",       sty("KL3", fontSize=9,  fontName="Helvetica", textColor=GREY, alignment=TA_CENTER)),
+             Paragraph("Safety Buffer",    sty("KL4", fontSize=9,  fontName="Helvetica", textColor=GREY, alignment=TA_CENTER))],
+        ], colWidths=[pw / 4] * 4)
+        kpi.setStyle(TableStyle([
+            ("BACKGROUND", (0, 0), (-1, -1), BLUE_LT), ("BOX", (0, 0), (-1, -1), 0.5, BORDER),
+            ("LINEBEFORE", (1, 0), (3, -1), 0.5, BORDER),
+            ("TOPPADDING", (0, 0), (-1, -1), 12), ("BOTTOMPADDING", (0, 0), (-1, -1), 10),
+        ]))
+        story += [kpi, Spacer(1, 0.3 * cm)]
+
+        # ── Risk badge ──
+        rb = Table([[Paragraph(f"<b>Risk Level: {risk_icon}  |  Score: {rscore}/100</b>",
+            sty("RB", fontSize=11, fontName="Helvetica-Bold", textColor=risk_color, alignment=TA_CENTER))]],
+            colWidths=[pw])
+        rb.setStyle(TableStyle([
+            ("BACKGROUND", (0, 0), (-1, -1), LIGHT), ("BOX", (0, 0), (-1, -1), 1.5, risk_color),
+            ("TOPPADDING", (0, 0), (-1, -1), 10), ("BOTTOMPADDING", (0, 0), (-1, -1), 10),
+        ]))
+        story += [rb, Spacer(1, 0.5 * cm)]
+
+        # ── Peer benchmarks ──
+        if peers:
+            from cohorts import peer_lines
+            story += [
+                Paragraph("Compared with Your Peers", sty("SC_pe", fontSize=12, fontName="Helvetica-Bold", textColor=BLUE, spaceBefore=4, spaceAfter=6)),
+                HRFlowable(width=pw, thickness=1, color=BORDER), Spacer(1, 0.2 * cm),
+            ]
+            story += [Paragraph(safe(line), sty(f"PE{i}", fontSize=10, fontName="Helvetica", textColor=DARK, leading=15))
+                      for i, line in enumerate(peer_lines(peers))]
+            story.append(Spacer(1, 0.5 * cm))
+
+        # ── Profile ──
+        story += [
+            Paragraph("Worker Profile", sty("SC", fontSize=12, fontName="Helvetica-Bold", textColor=BLUE, spaceBefore=4, spaceAfter=6)),
+            HRFlowable(width=pw, thickness=1, color=BORDER), Spacer(1, 0.2 * cm),
+        ]
+        profile_data = []
+        if worker_name:
+            profile_data.append(["Name", safe(worker_name)])
+        profile_data += [
+            ["Worker Type", safe(worker_type)],
+            ["City", safe(city)],
+            ["Dependents", str(analysis.dependents)],
+            ["Monthly Expenses", f"Rs. {analysis.monthly_exp:,.0f}"],
+            ["Weekly Expense Target", f"Rs. {weekly_expense:,.0f}"],
+        ]
+        prof = Table(profile_data, colWidths=[pw * 0.38, pw * 0.62])
+        prof.setStyle(TableStyle([
+            ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"), ("FONTNAME", (1, 0), (1, -1), "Helvetica"),
+            ("FONTSIZE", (0, 0), (-1, -1), 10),
+            ("TEXTCOLOR", (0, 0), (0, -1), GREY), ("TEXTCOLOR", (1, 0), (1, -1), DARK),
+            ("ROWBACKGROUNDS", (0, 0), (-1, -1), [LIGHT, white]),
+            ("BOX", (0, 0), (-1, -1), 0.5, BORDER), ("INNERGRID", (0, 0), (-1, -1), 0.25, BORDER),
+            ("TOPPADDING", (0, 0), (-1, -1), 6), ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
+        ]))
+        story += [prof, Spacer(1, 0.5 * cm)]
+
+        # ── Weekly income table ──
+        story += [
+            Paragraph("Weekly Income Data", sty("SC2", fontSize=12, fontName="Helvetica-Bold", textColor=BLUE, spaceBefore=4, spaceAfter=6)),
+            HRFlowable(width=pw, thickness=1, color=BORDER), Spacer(1, 0.2 * cm),
+        ]
+        # Rows of 4 weeks (label row + amount row); long histories show the latest PDF_TABLE_WEEKS
+        n_wk   = len(weekly_income)
+        first  = max(0, n_wk - PDF_TABLE_WEEKS)
+        wk_sty = sty("WH", fontSize=9, fontName="Helvetica-Bold", textColor=GREY, alignment=TA_CENTER)
+        wk_red = sty("WVR", fontSize=11, fontName="Helvetica-Bold", textColor=RED, alignment=TA_CENTER)
+        wk_grn = sty("WVG", fontSize=11, fontName="Helvetica-Bold", textColor=GREEN, alignment=TA_CENTER)
+        wk_rows = []
+        for row in range(first, n_wk, 4):
+            idx = range(row, min(row + 4, n_wk))
+            wk_rows.append([Paragraph(f"Week {i+1}", wk_sty) for i in idx] + [""] * (4 - len(idx)))
+            wk_rows.append([Paragraph(f"Rs. {weekly_income[i]:,.0f}", wk_red if weekly_income[i] < weekly_expense else wk_grn)
+                            for i in idx] + [""] * (4 - len(idx)))
+        wk_tbl = Table(wk_rows or [[""] * 4], colWidths=[pw / 4] * 4)
+        wk_tbl.setStyle(TableStyle([
+            ("ROWBACKGROUNDS", (0, 0), (-1, -1), [LIGHT, white]),
+            ("BOX", (0, 0), (-1, -1), 0.5, BORDER), ("INNERGRID", (0, 0), (-1, -1), 0.25, BORDER),
+            ("TOPPADDING", (0, 0), (-1, -1), 10), ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
+        ]))
+        band_str = "  |  ".join(
+            f"Week {len(weekly_income) + i + 1}: Rs. {lo:,.0f} - {hi:,.0f}"
+            for i, (lo, hi) in enumerate(zip(analysis.forecast_low, analysis.forecast_high)))
+        shown_note = f"Latest {n_wk - first} of {n_wk} weeks  |  " if first else ""
+        story += [
+            wk_tbl, Spacer(1, 0.15 * cm),
+            Paragraph(f"{shown_note}Red = below target (Rs. {weekly_expense:,.0f}/wk)  |  Green = on target or above",
+                sty("SM", fontSize=8, fontName="Helvetica", textColor=GREY)),
+            Spacer(1, 0.15 * cm),
+            Paragraph(f"Likely range (10th-90th percentile)  |  {band_str}",
+                sty("SM2", fontSize=8, fontName="Helvetica", textColor=GREY)),
+            Spacer(1, 0.5 * cm),
+        ]
+
+        # ── Income Chart ──
+        try:
+            pdf_L = {
+                "chart_lbl_actual":   "Actual Income",
+                "chart_lbl_forecast": "Forecast",
+                "chart_lbl_expense":  "Expense Line",
+                "chart_title":        "Income Overview",
+                "chart_trend":        "Trend",
+                "chart_avg":          "Your Average",
+            }
+            chart_fig = build_income_chart(
+                weekly_income, weekly_expense, avg, fcast, pdf_L, for_pdf=True,
+                bands=(analysis.forecast_low, analysis.forecasts, analysis.forecast_high),
+            )
+            img_bytes = get_rasterizer().to_png(chart_fig, width=740, height=370, scale=2)
+            img_buf   = io.BytesIO(img_bytes)
+
+            story += [
+                Paragraph("Income Chart", sty("SC_ch", fontSize=12, fontName="Helvetica-Bold", textColor=BLUE, spaceBefore=4, spaceAfter=6)),
+                HRFlowable(width=pw, thickness=1, color=BORDER),
+                Spacer(1, 0.2 * cm),
+                RLImage(img_buf, width=pw, height=pw * 0.5),
+                Spacer(1, 0.5 * cm),
+            ]
+            chart_ok = True
+        except Exception as chart_err:
+            chart_ok = False
+            story += [
+                Paragraph(f"(Chart unavailable: {chart_err})",
+                    sty("CE", fontSize=9, fontName="Helvetica", textColor=GREY)),
+                Spacer(1, 0.3 * cm),
+            ]
+
+        # ── Buffer ──
+        story += [
+            Paragraph("Emergency Buffer Plan", sty("SC3", fontSize=12, fontName="Helvetica-Bold", textColor=BLUE, spaceBefore=4, spaceAfter=6)),
+            HRFlowable(width=pw, thickness=1, color=BORDER), Spacer(1, 0.2 * cm),
+        ]
+        buf_tbl = Table([
+            [Paragraph("Target Emergency Fund", sty("BL1", fontSize=9, fontName="Helvetica", textColor=GREY, alignment=TA_CENTER)),
+             Paragraph("Monthly Savings Goal",  sty("BL2", fontSize=9, fontName="Helvetica", textColor=GREY, alignment=TA_CENTER)),
+             Paragraph("Weeks Protected",       sty("BL3", fontSize=9, fontName="Helvetica", textColor=GREY, alignment=TA_CENTER))],
+            [Paragraph(f"<b>Rs. {bamt:,.0f}</b>",     sty("BV1", fontSize=14, fontName="Helvetica-Bold", textColor=BLUE, alignment=TA_CENTER)),
+             Paragraph(f"<b>Rs. {msave:,.0f}/mo</b>", sty("BV2", fontSize=14, fontName="Helvetica-Bold", textColor=BLUE, alignment=TA_CENTER)),
+             Paragraph(f"<b>{bwks} weeks</b>",        sty("BV3", fontSize=14, fontName="Helvetica-Bold", textColor=BLUE, alignment=TA_CENTER))],
+        ], colWidths=[pw / 3] * 3)
+        buf_tbl.setStyle(TableStyle([
+            ("BACKGROUND", (0, 0), (-1, -1), BLUE_LT), ("BOX", (0, 0), (-1, -1), 0.5, BORDER),
+            ("LINEBEFORE", (1, 0), (2, -1), 0.5, BORDER),
+            ("TOPPADDING", (0, 0), (-1, -1), 12), ("BOTTOMPADDING", (0, 0), (-1, -1), 12),
+        ]))
+        story += [buf_tbl, Spacer(1, 0.5 * cm)]
+
+        # ── AI Insights ──
+        if ai_insights:
+            story += [
+                Paragraph("AI Personalized Plan", sty("SC4", fontSize=12, fontName="Helvetica-Bold", textColor=BLUE, spaceBefore=4, spaceAfter=6)),
+                HRFlowable(width=pw, thickness=1, color=BORDER), Spacer(1, 0.2 * cm),
+            ]
+            for sec in re.split(r'####\s*', safe(ai_insights)):
+                if not sec.strip():
+                    continue
+                lines = sec.strip().split('\n')
+                story.append(Paragraph(f"<b>{safe(lines[0]).strip()}</b>",
+                    sty("AIH", fontSize=11, fontName="Helvetica-Bold", textColor=BLUE, spaceBefore=10, spaceAfter=4)))
+                for ln in lines[1:]:
+                    ln = ln.strip()
+                    if not ln:
+                        continue
+                    ln = re.sub(r'\*\*(.+?)\*\*', r'<b>\1</b>', safe(ln))
+                    indent = 10 if (ln.startswith("- ") or ln.startswith("* ")) else 0
+                    if indent:
+                        ln = "  - " + ln[2:]
+                    story.append(Paragraph(ln, sty(f"AIB{hash(ln)&0xFFFF}", fontSize=10, fontName="Helvetica",
+                        textColor=DARK, leading=15, spaceAfter=3, leftIndent=indent)))
+            story.append(Spacer(1, 0.5 * cm))
+
+        story += [
+            HRFlowable(width=pw, thickness=0.5, color=BORDER), Spacer(1, 0.2 * cm),
+            Paragraph("Generated by FinStab  |  Free financial planning for gig workers in India",
+                sty("FT", fontSize=8, fontName="Helvetica", textColor=GREY, alignment=TA_CENTER)),
+        ]
+        doc.build(story)
+        buf.seek(0)
+        return buf.getvalue(), chart_ok
+
+    except Exception as e:
+        lines = ["FinStab Report", "=" * 50, "",
+                 f"Name: {worker_name}" if worker_name else "",
+                 f"Worker: {worker_type} | City: {city} | Dependents: {analysis.dependents}",
+                 f"Monthly Expenses: Rs. {analysis.monthly_exp:,.0f}", "", "Weekly Income:"]
+        for i, v in enumerate(analysis.weekly_income):
+            lines.append(f"  Week {i+1}: Rs. {v:,.0f}")
+        lines += ["", f"Average: Rs. {analysis.avg_income:,.0f}",
+                  f"Forecast: Rs. {analysis.forecast:,.0f}",
+                  f"Risk: {analysis.risk_score}/100 ({analysis.risk_label})",
+                  f"Emergency Buffer: Rs. {analysis.buffer_amount:,.0f}"]
+        if peers:
+            from cohorts import peer_lines
+            lines += [""] + peer_lines(peers)
+        lines += ["", "AI Insights:", ai_insights or "N/A", f"\n[PDF error: {e}]"]
+        return "\n".join(lines).encode("utf-8"), False
+
+
+# ══════════════════════════════════════════════════════════
+# PDF CACHE
+# ══════════════════════════════════════════════════════════
+PDF_CACHE_SIZE = 64
+
+_pdf_cache: "OrderedDict[str, bytes]" = OrderedDict()
+_pdf_lock  = threading.Lock()
+
+
+def _pdf_cache_key(analysis: IncomeAnalysis, worker_type, city, ai_insights, worker_name, L, peers=None) -> str:
+    payload = json.dumps(
+        [[getattr(analysis, f) for f in analysis.__slots__],
+         worker_type, city, ai_insights or "", worker_name or "", L, peers],
+        sort_keys=True, default=str, ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def generate_pdf_report(analysis, worker_type, city, ai_insights, worker_name="", L=None, peers=None):
+    """
+    PDF bytes for this report. Results are cached under a hash of every
+    input (LRU, PDF_CACHE_SIZE entries), so repeated calls for an unchanged
+    report skip the ReportLab build and chart rasterisation entirely.
+    Plain-text fallbacks and PDFs whose chart failed to render are returned
+    but never cached, so they are rebuilt once the renderer works. `peers` is a
+    cohorts.CohortBenchmarks.percentiles() result, shown under the risk badge.
+    """
+    key = _pdf_cache_key(analysis, worker_type, city, ai_insights, worker_name, L, peers)
+    with _pdf_lock:
+        if key in _pdf_cache:
+            _pdf_cache.move_to_end(key)
+            return _pdf_cache[key]
+
+    pdf_bytes, chart_ok = _build_pdf_report(analysis, worker_type, city, ai_insights,
+                                            worker_name=worker_name, L=L, peers=peers)
+    if chart_ok:
+        with _pdf_lock:
+            _pdf_cache[key] = pdf_bytes
+            _pdf_cache.move_to_end(key)
+            while len(_pdf_cache) > PDF_CACHE_SIZE:
+                _pdf_cache.popitem(last=False)
+    return pdf_bytes
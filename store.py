@@ -0,0 +1,395 @@
+"""
+store.py — Local history of workers' weekly incomes, profiles and analyses
+  • IncomeStore → SQLite store keyed by worker and ISO week, with bulk upsert
+  • worker_key() → opaque id derived from a personal code the worker chooses in the app
+  • week_start() → Monday of the ISO week containing a date
+
+Each worker's latest analysis also counts towards the peer benchmarks of
+their city and worker type (see cohorts.py), kept as per-bin counts that
+save_analysis() updates in the same transaction.
+
+The store is off unless INCOME_DB_PATH names a database file (e.g.
+INCOME_DB_PATH=.cache/finstab.sqlite), so a deployment keeps no personal
+financial data unless its operator opts in.
+
+Nothing is ever deleted. Weekly amounts are upserted per (worker, week,
+source), so re-entering a week corrects it; profiles and analyses are
+appended, with the latest row being the current one. Rows for one worker
+are clustered by primary key, so reading years of weeks is one range scan.
+"""
+
+import datetime as dt
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable
+
+DEFAULT_DB_PATH  = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "finstab.sqlite")
+INCOME_DB_PATH   = os.getenv("INCOME_DB_PATH", "")
+INCOME_KEY_SALT  = os.getenv("INCOME_KEY_SALT", "finstab-worker-key")
+MIN_CODE_LENGTH  = 6
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS weekly_income (
+    worker_id TEXT NOT NULL,
+    week      TEXT NOT NULL,               -- ISO date of the week's Monday
+    source    TEXT NOT NULL DEFAULT '',    -- '' for manual entry, else platform name
+    amount    REAL NOT NULL,
+    recorded  REAL NOT NULL,
+    PRIMARY KEY (worker_id, week, source)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_weekly_income_week ON weekly_income(week);
+
+CREATE TABLE IF NOT EXISTS worker_profiles (
+    worker_id   TEXT NOT NULL,
+    recorded    REAL NOT NULL,
+    name        TEXT NOT NULL,
+    worker_type TEXT NOT NULL,
+    city        TEXT NOT NULL,
+    dependents  INTEGER NOT NULL,
+    monthly_exp REAL NOT NULL,
+    PRIMARY KEY (worker_id, recorded)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_worker_profiles_cohort ON worker_profiles(city, worker_type);
+
+CREATE TABLE IF NOT EXISTS analyses (
+    id          INTEGER PRIMARY KEY,
+    worker_id   TEXT NOT NULL,
+    created     REAL NOT NULL,
+    worker_type TEXT NOT NULL,
+    city        TEXT NOT NULL,
+    first_week  TEXT,
+    last_week   TEXT,
+    avg_income  REAL NOT NULL,
+    risk_score  INTEGER NOT NULL,
+    risk_label  TEXT NOT NULL,
+    result      TEXT NOT NULL              -- every IncomeAnalysis field, as JSON
+);
+CREATE INDEX IF NOT EXISTS idx_analyses_worker ON analyses(worker_id, created);
+
+CREATE TABLE IF NOT EXISTS cohort_bins (
+    city        TEXT NOT NULL,             -- cohorts.cohort_key() form
+    worker_type TEXT NOT NULL,
+    metric      TEXT NOT NULL,             -- income / volatility / risk
+    bin         INTEGER NOT NULL,
+    count       INTEGER NOT NULL,
+    PRIMARY KEY (city, worker_type, metric, bin)
+) WITHOUT ROWID;
+"""
+
+_PROFILE_FIELDS = ("name", "worker_type", "city", "dependents", "monthly_exp")
+
+
+@functools.lru_cache(maxsize=256)
+def worker_key(code: str) -> str | None:
+    """
+    Stored id for a worker's personal code (None if shorter than
+    MIN_CODE_LENGTH). Only a salted PBKDF2 hash is kept, so neither the code
+    nor anything a stranger could guess, like a name, reaches the database.
+    """
+    code = (code or "").strip()
+    if len(code) < MIN_CODE_LENGTH:
+        return None
+    digest = hashlib.pbkdf2_hmac("sha256", code.encode("utf-8"), INCOME_KEY_SALT.encode("utf-8"), 200_000)
+    return "k:" + digest.hex()[:40]
+
+
+def week_start(day: dt.date | str | None = None) -> str:
+    """ISO date of the Monday starting the ISO week that contains `day` (default today)."""
+    if day is None:
+        day = dt.date.today()
+    elif isinstance(day, str):
+        day = dt.date.fromisoformat(day[:10])
+    elif isinstance(day, dt.datetime):
+        day = day.date()
+    return (day - dt.timedelta(days=day.weekday())).isoformat()
+
+
+def _shift_week(week: str, n: int) -> str:
+    return (dt.date.fromisoformat(week) + dt.timedelta(weeks=n)).isoformat()
+
+
+class IncomeStore:
+    """
+    SQLite-backed store (WAL mode, safe across threads and processes). An
+    empty `path` disables it: writes are dropped and reads come back empty.
+    """
+
+    def __init__(self, path: str = INCOME_DB_PATH):
+        self.path       = path
+        self.generation = 0    # bumped on every stored analysis; invalidates cohort caches
+        self._ready     = False
+        self._lock      = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if not self._ready:
+            with self._lock:
+                if not self._ready:
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.executescript(_SCHEMA)
+                    with conn:
+                        if conn.execute("SELECT 1 FROM cohort_bins LIMIT 1").fetchone() is None:
+                            self._rebuild_cohorts(conn)   # analyses stored before cohorts existed
+                    self._ready = True
+        return conn
+
+    def _run(self, fn, default=None):
+        if not self.enabled:
+            return default
+        conn = self._connect()
+        try:
+            with conn:
+                return fn(conn)
+        finally:
+            conn.close()
+
+    # ── weekly incomes ──
+    def upsert_weeks(self, rows: Iterable[tuple]) -> int:
+        """
+        Bulk insert-or-update of (worker_id, week, amount[, source]) rows in
+        one transaction. `week` may be any date inside the week. Returns the
+        number of rows written.
+        """
+        now = time.time()
+
+        def norm(r):
+            worker_id, week, amount, *rest = r
+            return worker_id, week_start(week), (rest[0] if rest else "") or "", float(amount), now
+
+        def write(conn):
+            cur = conn.executemany(
+                "INSERT INTO weekly_income (worker_id, week, source, amount, recorded) VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT(worker_id, week, source) DO UPDATE SET"
+                " amount = excluded.amount, recorded = excluded.recorded",
+                (norm(r) for r in rows))
+            return cur.rowcount
+        return self._run(write, 0)
+
+    def record_weeks(self, worker_id: str, amounts, last_week: str | None = None, source: str = "",
+                     changed_only: bool = False) -> int:
+        """
+        Store consecutive weekly amounts, oldest first, ending with the week
+        that starts on `last_week` (default: the last completed week). With
+        `changed_only`, `amounts` are week totals as shown by week_amounts():
+        weeks whose total is unchanged are skipped, and so are 0.0 amounts
+        for weeks with nothing stored yet (an empty input, which
+        weekly_income() already reads as 0.0). A changed week's `source` row
+        is set so that the total across sources becomes the new amount.
+        """
+        amounts = [float(v) for v in amounts]
+        last    = week_start(last_week) if last_week else _shift_week(week_start(), -1)
+        first   = _shift_week(last, -(len(amounts) - 1))
+        rows    = [(worker_id, _shift_week(first, i), v, source) for i, v in enumerate(amounts)]
+        if changed_only:
+            totals = self.week_amounts(worker_id, len(amounts), last)
+            own    = self.week_amounts(worker_id, len(amounts), last, source=source)
+            rows   = [(wid, wk, v - (total - (mine or 0.0)) if total is not None else v, src)
+                      for (wid, wk, v, src), total, mine in zip(rows, totals, own)
+                      if (v != 0.0 if total is None else v != total)]
+        return self.upsert_weeks(rows) if rows else 0
+
+    def week_amounts(self, worker_id: str, n: int, last_week: str | None = None,
+                     source: str | None = None) -> list[float | None]:
+        """
+        Amounts for the `n` calendar weeks ending with `last_week` (default:
+        the last completed week), oldest first, aligned with record_weeks();
+        None where nothing is stored. Summed across sources unless `source` is given.
+        """
+        last  = week_start(last_week) if last_week else _shift_week(week_start(), -1)
+        first = _shift_week(last, -(n - 1))
+        sql, args = ("SELECT week, SUM(amount) FROM weekly_income WHERE worker_id = ? AND week BETWEEN ? AND ?",
+                     [worker_id, first, last])
+        if source is not None:
+            sql += " AND source = ?"; args.append(source)
+        rows = self._run(lambda c: dict(c.execute(sql + " GROUP BY week", args)), {})
+        return [rows.get(_shift_week(first, i)) for i in range(n)]
+
+    def weeks(self, worker_id: str, since: str | None = None, until: str | None = None,
+              last: int | None = None) -> list[tuple[str, float]]:
+        """(week, amount) pairs in week order, summed across sources."""
+        sql, args = "SELECT week, SUM(amount) FROM weekly_income WHERE worker_id = ?", [worker_id]
+        if since:
+            sql += " AND week >= ?"; args.append(week_start(since))
+        if until:
+            sql += " AND week <= ?"; args.append(week_start(until))
+        sql += " GROUP BY week ORDER BY week"
+        if last:
+            sql = f"SELECT * FROM ({sql} DESC LIMIT ?) ORDER BY week"; args.append(int(last))
+        return self._run(lambda c: [(w, float(a)) for w, a in c.execute(sql, args)], [])
+
+    def weekly_income(self, worker_id: str, last: int = 8) -> list[float]:
+        """
+        The `last` consecutive weeks up to the latest stored one, oldest first —
+        the input calc_risk_score expects. A week with no row inside that
+        window counts as 0.0 income.
+        """
+        span = self._run(lambda c: c.execute(
+            "SELECT MIN(week), MAX(week) FROM weekly_income WHERE worker_id = ?", (worker_id,)).fetchone())
+        if not span or span[0] is None:
+            return []
+        first = max(span[0], _shift_week(span[1], -(last - 1)))
+        rows  = dict(self.weeks(worker_id, since=first))
+        n     = (dt.date.fromisoformat(span[1]) - dt.date.fromisoformat(first)).days // 7 + 1
+        return [rows.get(_shift_week(first, i), 0.0) for i in range(n)]
+
+    # ── profiles ──
+    def save_profile(self, worker_id: str, name: str = "", worker_type: str = "", city: str = "",
+                     dependents: int = 0, monthly_exp: float = 0.0) -> bool:
+        """Append the profile if it differs from the current one; True if a row was added."""
+        new = (name, worker_type, city, int(dependents), float(monthly_exp))
+
+        def write(conn):
+            cur = self._profile(conn, worker_id)
+            if cur is not None and tuple(cur[k] for k in _PROFILE_FIELDS) == new:
+                return False
+            conn.execute("INSERT INTO worker_profiles (worker_id, recorded, name, worker_type, city,"
+                         " dependents, monthly_exp) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         (worker_id, time.time(), *new))
+            return True
+        return self._run(write, False)
+
+    @staticmethod
+    def _profile(conn, worker_id):
+        row = conn.execute(
+            "SELECT name, worker_type, city, dependents, monthly_exp FROM worker_profiles"
+            " WHERE worker_id = ? ORDER BY recorded DESC LIMIT 1", (worker_id,)).fetchone()
+        return dict(zip(_PROFILE_FIELDS, row)) if row else None
+
+    def profile(self, worker_id: str) -> dict | None:
+        return self._run(lambda c: self._profile(c, worker_id))
+
+    def workers(self, city: str | None = None, worker_type: str | None = None) -> list[str]:
+        """Ids of workers whose current profile matches the given city / worker type."""
+        sql = ("SELECT p.worker_id FROM worker_profiles p JOIN ("
+               " SELECT worker_id, MAX(recorded) AS recorded FROM worker_profiles GROUP BY worker_id"
+               ") cur USING (worker_id, recorded) WHERE 1")
+        args = []
+        if city is not None:
+            sql += " AND p.city = ?"; args.append(city)
+        if worker_type is not None:
+            sql += " AND p.worker_type = ?"; args.append(worker_type)
+        return self._run(lambda c: [r[0] for r in c.execute(sql + " ORDER BY p.worker_id", args)], [])
+
+    # ── analyses ──
+    def save_analysis(self, worker_id: str, analysis, worker_type: str = "", city: str = "",
+                      last_week: str | None = None) -> int | None:
+        """
+        Append one IncomeAnalysis; returns its row id. It replaces the
+        worker's previous analysis in the cohort benchmarks.
+        """
+        a      = analysis
+        last   = week_start(last_week) if last_week else _shift_week(week_start(), -1)
+        first  = _shift_week(last, -(a.n_weeks - 1)) if a.n_weeks else None
+        result = json.dumps({f: getattr(a, f) for f in type(a).__slots__})
+
+        def write(conn):
+            prev = conn.execute(
+                "SELECT worker_type, city, result FROM analyses WHERE worker_id = ?"
+                " ORDER BY created DESC LIMIT 1", (worker_id,)).fetchone()
+            row_id = conn.execute(
+                "INSERT INTO analyses (worker_id, created, worker_type, city, first_week, last_week,"
+                " avg_income, risk_score, risk_label, result) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (worker_id, time.time(), worker_type, city, first, last,
+                 a.avg_income, a.risk_score, a.risk_label, result)).lastrowid
+            deltas = self._cohort_rows(a, city, worker_type, +1)
+            if prev is not None:
+                deltas += self._cohort_rows(_Stored(prev[2]), prev[1], prev[0], -1)
+            self._bump_cohorts(conn, deltas)
+            return row_id
+        row_id = self._run(write)
+        self.generation += 1
+        return row_id
+
+    def analyses(self, worker_id: str, limit: int = 20) -> list[dict]:
+        """Past analyses, newest first, each with the stored IncomeAnalysis fields under "result"."""
+        def read(conn):
+            rows = conn.execute(
+                "SELECT id, created, worker_type, city, first_week, last_week, result FROM analyses"
+                " WHERE worker_id = ? ORDER BY created DESC LIMIT ?", (worker_id, int(limit)))
+            return [{"id": i, "created": c, "worker_type": wt, "city": ci, "first_week": fw,
+                     "last_week": lw, "result": json.loads(r)} for i, c, wt, ci, fw, lw, r in rows]
+        return self._run(read, [])
+
+    # ── cohort benchmarks ──
+    @staticmethod
+    def _cohort_rows(analysis, city, worker_type, delta) -> list[tuple]:
+        from cohorts import METRICS, QuantileSketch, cohort_key, cohort_metrics
+
+        c, t   = cohort_key(city, worker_type)
+        values = cohort_metrics(analysis)
+        return [(c, t, m, QuantileSketch.for_metric(m).bin(values[m]), delta) for m in METRICS]
+
+    @staticmethod
+    def _bump_cohorts(conn, rows):
+        conn.executemany(
+            "INSERT INTO cohort_bins (city, worker_type, metric, bin, count) VALUES (?, ?, ?, ?, ?)"
+            " ON CONFLICT(city, worker_type, metric, bin) DO UPDATE SET count = count + excluded.count",
+            rows)
+        conn.execute("DELETE FROM cohort_bins WHERE count <= 0")
+
+    def _rebuild_cohorts(self, conn):
+        conn.execute("DELETE FROM cohort_bins")
+        latest = conn.execute(
+            "SELECT a.worker_type, a.city, a.result FROM analyses a JOIN ("
+            " SELECT worker_id, MAX(created) AS created FROM analyses GROUP BY worker_id"
+            ") cur USING (worker_id, created)")
+        for wt, city, result in latest:
+            self._bump_cohorts(conn, self._cohort_rows(_Stored(result), city, wt, +1))
+
+    def rebuild_cohorts(self):
+        """Recount every cohort from the latest analysis of each worker."""
+        self._run(self._rebuild_cohorts)
+        self.generation += 1
+
+    def cohort_counts(self, city: str | None, worker_type: str | None) -> dict[str, list[int]]:
+        """
+        {metric: per-bin counts} for one cohort, in cohorts.cohort_key() form;
+        None for city or worker type sums over it (the sketches merge).
+        """
+        from cohorts import METRIC_BINS
+
+        sql, args = "SELECT metric, bin, SUM(count) FROM cohort_bins WHERE 1", []
+        if city is not None:
+            sql += " AND city = ?"; args.append(city)
+        if worker_type is not None:
+            sql += " AND worker_type = ?"; args.append(worker_type)
+
+        def read(conn):
+            out = {}
+            for metric, b, n in conn.execute(sql + " GROUP BY metric, bin", args):
+                if metric in METRIC_BINS:
+                    out.setdefault(metric, [0] * (len(METRIC_BINS[metric]) + 1))[b] = int(n)
+            return out
+        return self._run(read, {})
+
+    def load_analysis(self, worker_id: str, last: int = 8):
+        """Run a fresh IncomeAnalysis on the stored profile and latest `last` weeks (None if missing)."""
+        from utils import IncomeAnalysis
+
+        profile = self.profile(worker_id)
+        incomes = self.weekly_income(worker_id, last=last) if profile else []
+        if not incomes:
+            return None
+        return IncomeAnalysis.from_weeks(incomes, profile["monthly_exp"], profile["dependents"])
+
+
+class _Stored:
+    """A stored analysis's JSON fields as attributes, enough for cohorts.cohort_metrics()."""
+
+    def __init__(self, result: str):
+        self.__dict__.update(json.loads(result))
+
+
+# Shared instance for the Streamlit app (disabled unless INCOME_DB_PATH is set)
+income_store = IncomeStore()
@@ -0,0 +1,230 @@
+"""
+styles.py — Page CSS and HTML snippets for the FinStab Streamlit app
+  • APP_CSS, TOPBAR_HTML → injected once per page
+  • chat_bubble()        → one chat message as HTML
+  • ChatTranscript       → the whole chat, each message rendered only once
+"""
+
+import re
+
+APP_CSS = """
+<style>
+@import url('https://fonts.googleapis.com/css2?family=Plus+Jakarta+Sans:wght@400;600;700;800&family=Outfit:wght@300;400;500;600;700&display=swap');
+
+:root {
+  --bg:#F7F9FC; --white:#FFFFFF; --border:#DDE4EF; --text:#1A2035;
+  --muted:#6B7A9B; --accent:#2563EB; --accent-lt:#EEF3FE;
+  --green:#16A34A; --green-lt:#DCFCE7; --amber:#D97706; --amber-lt:#FEF3C7;
+  --red:#DC2626; --red-lt:#FEE2E2; --radius:14px;
+  --shadow:0 2px 16px rgba(37,99,235,0.07);
+}
+html, body, [class*="css"] {
+  font-family: 'Outfit', sans-serif !important;
+  background: var(--bg) !important;
+  color: var(--text) !important;
+}
+.main .block-container { max-width:860px !important; padding:0 1.5rem 4rem !important; }
+section[data-testid="stSidebar"] { display:none !important; }
+#MainMenu, footer, header { visibility:hidden !important; }
+.stDeployButton { display:none !important; }
+
+.topbar { display:flex; align-items:center; justify-content:space-between;
+  padding:18px 0 24px; border-bottom:1px solid var(--border); margin-bottom:32px; }
+.topbar-brand { display:flex; align-items:center; gap:10px; }
+.topbar-logo { width:40px; height:40px; background:var(--accent); border-radius:10px;
+  display:flex; align-items:center; justify-content:center; font-size:22px; color:white; }
+.topbar-name { font-family:'Plus Jakarta Sans',sans-serif; font-weight:800; font-size:18px; color:var(--text); }
+.topbar-name span { color:var(--accent); }
+.topbar-badge { font-size:11px; background:var(--accent-lt); color:var(--accent);
+  padding:4px 12px; border-radius:20px; font-weight:600; letter-spacing:0.02em; }
+
+.hero { text-align:center; padding:8px 0 40px; }
+.hero-title { font-family:'Plus Jakarta Sans',sans-serif; font-size:clamp(26px,5vw,40px);
+  font-weight:800; line-height:1.15; color:var(--text); margin-bottom:12px; }
+.hero-title span { color:var(--accent); }
+.hero-sub { font-size:16px; color:var(--muted); max-width:480px; margin:0 auto; line-height:1.7; }
+
+.step-pill { display:inline-flex; align-items:center; gap:8px; background:var(--accent-lt);
+  color:var(--accent); font-size:13px; font-weight:700; padding:6px 16px;
+  border-radius:24px; margin-bottom:16px; }
+
+.card { background:var(--white); border:1px solid var(--border); border-radius:var(--radius);
+  padding:28px; margin-bottom:20px; box-shadow:var(--shadow); }
+.card-title { font-family:'Plus Jakarta Sans',sans-serif; font-size:17px; font-weight:700;
+  color:var(--text); margin-bottom:6px; }
+.card-sub { font-size:13px; color:var(--muted); margin-bottom:20px; }
+
+.chart-card { background:var(--white); border:1px solid var(--border); border-radius:var(--radius);
+  padding:24px 20px 16px; margin-bottom:20px; box-shadow:var(--shadow); }
+.chart-title { font-family:'Plus Jakarta Sans',sans-serif; font-size:16px; font-weight:700;
+  color:var(--text); margin-bottom:4px; }
+.chart-sub { font-size:12px; color:var(--muted); margin-bottom:16px; }
+.chart-legend { display:flex; gap:18px; flex-wrap:wrap; margin-bottom:14px; }
+.legend-dot { display:inline-flex; align-items:center; gap:6px; font-size:12px;
+  color:var(--muted); font-weight:500; }
+.dot { width:10px; height:10px; border-radius:50%; display:inline-block; }
+
+.kpi { background:var(--white); border:1px solid var(--border); border-radius:12px;
+  padding:18px 20px; box-shadow:var(--shadow); }
+.kpi-label { font-size:12px; font-weight:600; color:var(--muted); text-transform:uppercase;
+  letter-spacing:0.06em; margin-bottom:8px; }
+.kpi-value { font-family:'Plus Jakarta Sans',sans-serif; font-size:26px; font-weight:800;
+  color:var(--text); line-height:1; }
+.kpi-delta { font-size:12px; margin-top:5px; font-weight:600; }
+.delta-up { color:var(--green); } .delta-down { color:var(--red); } .delta-mid { color:var(--muted); }
+
+.risk-low  { background:var(--green-lt); color:var(--green); }
+.risk-med  { background:var(--amber-lt); color:var(--amber); }
+.risk-high { background:var(--red-lt);   color:var(--red);   }
+.risk-badge { display:inline-flex; align-items:center; gap:6px; padding:5px 14px;
+  border-radius:20px; font-size:13px; font-weight:700; margin-top:6px; }
+
+.peer-card { background:var(--white); border:1px solid var(--border); border-radius:12px;
+  padding:16px 20px; box-shadow:var(--shadow); margin:12px 0 20px; }
+.peer-line { font-size:14px; color:var(--text); line-height:1.7; }
+
+.warn-box { background:var(--amber-lt); border:1px solid #FCD34D;
+  border-left:4px solid var(--amber); border-radius:10px; padding:14px 18px;
+  font-size:14px; color:#92400E; margin-bottom:20px; line-height:1.6; }
+
+.ai-card { background:var(--accent-lt); border:1px solid #BFDBFE;
+  border-left:4px solid var(--accent); border-radius:var(--radius);
+  padding:24px 28px; margin-bottom:20px; }
+.ai-tag { display:inline-block; font-size:10px; font-weight:700; letter-spacing:0.12em;
+  text-transform:uppercase; background:var(--accent); color:white;
+  padding:3px 10px; border-radius:6px; margin-bottom:16px; }
+
+.buf-card { background:var(--white); border:1px solid var(--border); border-radius:12px;
+  padding:20px 16px; text-align:center; box-shadow:var(--shadow); }
+.buf-icon { font-size:28px; margin-bottom:10px; }
+.buf-val  { font-family:'Plus Jakarta Sans',sans-serif; font-weight:800; font-size:20px;
+  color:var(--accent); margin-bottom:5px; }
+.buf-lbl  { font-size:12px; color:var(--muted); line-height:1.5; }
+
+.lang-notice { background:#FEF3C7; border:1px solid #FCD34D; border-radius:10px;
+  padding:10px 16px; font-size:13px; color:#92400E; margin-bottom:16px; }
+
+.greeting-banner { background: linear-gradient(135deg, var(--accent-lt) 0%, #dbeafe 100%);
+  border: 1px solid #BFDBFE; border-radius: 12px; padding: 14px 20px;
+  font-size: 15px; font-weight: 600; color: var(--accent); margin-bottom: 20px; }
+
+.stTextInput > div > div > input,
+.stNumberInput > div > div > input {
+  background: #ffffff !important; border: 1.5px solid var(--border) !important;
+  border-radius: 10px !important; color: #1A2035 !important;
+  font-family: 'Outfit', sans-serif !important; font-size: 15px !important;
+}
+.stSelectbox > div > div {
+  background: #ffffff !important; border: 1.5px solid var(--border) !important;
+  border-radius: 10px !important;
+}
+.stSelectbox * { color: #1A2035 !important; }
+[data-baseweb="select"], [data-baseweb="select"] * { color: #1A2035 !important; background-color: transparent !important; }
+[data-baseweb="select"] input { color: #1A2035 !important; caret-color: #1A2035 !important; }
+.stSelectbox > div > div:focus-within,
+.stTextInput > div > div > input:focus,
+.stNumberInput > div > div > input:focus {
+  border-color: var(--accent) !important;
+  box-shadow: 0 0 0 3px rgba(37,99,235,0.12) !important;
+}
+[data-baseweb="popover"], [data-baseweb="popover"] > div,
+[data-baseweb="menu"], ul[data-baseweb="menu"] {
+  background: #ffffff !important; border: 1px solid var(--border) !important;
+  border-radius: 10px !important; box-shadow: 0 8px 24px rgba(37,99,235,0.12) !important;
+}
+[data-baseweb="popover"] *, [data-baseweb="menu"] * { color: #1A2035 !important; background-color: transparent !important; }
+[data-baseweb="popover"] li, [data-baseweb="menu"] li, [role="option"] { background: #ffffff !important; }
+[role="option"]:hover, [data-baseweb="popover"] [role="option"]:hover,
+[data-baseweb="menu"] [role="option"]:hover { background: var(--accent-lt) !important; }
+[role="option"]:hover *, [data-baseweb="popover"] [role="option"]:hover *,
+[data-baseweb="menu"] [role="option"]:hover * { color: var(--accent) !important; }
+[role="option"][aria-selected="true"], [data-baseweb="popover"] [aria-selected="true"],
+[data-baseweb="menu"] [aria-selected="true"] { background: var(--accent-lt) !important; font-weight: 600 !important; }
+[role="option"][aria-selected="true"] *, [data-baseweb="popover"] [aria-selected="true"] *,
+[data-baseweb="menu"] [aria-selected="true"] * { color: var(--accent) !important; }
+.stSelectbox label, .stTextInput label, .stNumberInput label,
+[data-testid="stWidgetLabel"] p { font-size: 14px !important; font-weight: 600 !important; color: #1A2035 !important; }
+
+.stButton > button {
+  background: var(--accent) !important; color: white !important;
+  font-family: 'Plus Jakarta Sans', sans-serif !important; font-weight: 700 !important;
+  font-size: 15px !important; border: none !important; border-radius: 10px !important;
+  padding: 12px 28px !important; transition: all 0.18s !important;
+}
+.stButton > button:hover {
+  background: #1d4ed8 !important;
+  box-shadow: 0 4px 18px rgba(37,99,235,0.28) !important;
+  transform: translateY(-1px) !important;
+}
+.stDownloadButton > button {
+  background: var(--accent) !important; color: white !important;
+  border: none !important; font-family: 'Plus Jakarta Sans', sans-serif !important;
+  font-weight: 700 !important; font-size: 15px !important; border-radius: 10px !important;
+  padding: 12px 28px !important; transition: all 0.18s !important; width: 100% !important;
+}
+.stDownloadButton > button:hover {
+  background: #1d4ed8 !important;
+  box-shadow: 0 4px 18px rgba(37,99,235,0.28) !important;
+  transform: translateY(-1px) !important;
+}
+
+.stSpinner > div { border-top-color: var(--accent) !important; }
+[data-testid="metric-container"] { display:none; }
+hr { border-color: var(--border) !important; margin: 28px 0 !important; }
+::-webkit-scrollbar { width:6px; }
+::-webkit-scrollbar-track { background:var(--bg); }
+::-webkit-scrollbar-thumb { background:var(--border); border-radius:3px; }
+</style>
+"""
+
+TOPBAR_HTML = """
+<div class="topbar">
+  <div class="topbar-brand">
+    <div class="topbar-logo">🛡</div>
+    <div class="topbar-name">Fin<span>Stab</span></div>
+  </div>
+  <div class="topbar-badge">AI for Social Good</div>
+</div>
+"""
+
+
+_BOLD = re.compile(r"\*\*(.+?)\*\*")
+
+
+def chat_bubble(role: str, text: str) -> str:
+    content = _BOLD.sub(r"<strong>\1</strong>", text).replace("\n", "<br>")
+    if role == "user":
+        return f"""<div style="display:flex;justify-content:flex-end;margin-bottom:14px;">
+              <div style="max-width:78%;padding:12px 16px;border-radius:16px;border-bottom-right-radius:4px;
+                          font-size:14px;line-height:1.65;background:#2563EB;color:white;">{content}</div>
+            </div>"""
+    return f"""<div style="display:flex;justify-content:flex-start;align-items:flex-start;gap:10px;margin-bottom:14px;">
+              <div style="width:34px;height:34px;border-radius:50%;background:#2563EB;color:white;
+                          display:flex;align-items:center;justify-content:center;flex-shrink:0;font-size:16px;">🛡</div>
+              <div style="max-width:78%;padding:12px 16px;border-radius:16px;border-bottom-left-radius:4px;
+                          font-size:14px;line-height:1.65;background:#F1F5FD;color:#1A2035;">{content}</div>
+            </div>"""
+
+
+class ChatTranscript:
+    """
+    Rendered HTML for an append-only chat history. Messages already seen
+    are never re-rendered; html() only formats the ones appended since the
+    last call. Handing it a different list (a reset or a new analysis)
+    starts over.
+    """
+    __slots__ = ("_history", "_count", "_html")
+
+    def __init__(self):
+        self._history = None
+        self._count   = 0
+        self._html    = ""
+
+    def html(self, history: list[dict]) -> str:
+        if history is not self._history or len(history) < self._count:
+            self._history, self._count, self._html = history, 0, ""
+        if len(history) > self._count:
+            self._html += "".join(chat_bubble(m["role"], m["content"]) for m in history[self._count:])
+            self._count = len(history)
+        return self._html
+
@@ -2,16 +2,29 @@
 utils.py — Core financial calculations for FinStab
 """
 
+import datetime as dt
+from collections import deque
+from dataclasses import dataclass
+
 import numpy as np
 
+WEEKS_PER_MONTH = 4.33
+
+
+def trend_slope(data: np.ndarray) -> float:
+    """Least-squares slope of the last (up to) 4 weeks; 0.0 with fewer than 2 points."""
+    last4 = data[-4:] if len(data) >= 4 else data
+    return float(np.polyfit(range(len(last4)), last4, 1)[0]) if len(last4) > 1 else 0.0
 
-def calc_risk_score(data: np.ndarray, weekly_expense: float) -> tuple[int, str]:
+
+def calc_risk_score(data: np.ndarray, weekly_expense: float, slope: float | None = None) -> tuple[int, str]:
     """
     Composite risk score (0–100).
       - Volatility     : up to 40 pts
       - Deficit freq   : up to 35 pts
       - Downward trend : up to 25 pts
     Returns (score, label) where label ∈ {LOW, MEDIUM, HIGH}
+    Pass a precomputed trend_slope(data) as `slope` to skip the fit.
     """
     if len(data) == 0:
         return 0, "LOW"
@@ -24,8 +37,8 @@ def calc_risk_score(data: np.ndarray, weekly_expense: float) -> tuple[int, str]:
     deficit_wks  = int(np.sum(data < weekly_expense))
     deficit_freq = (deficit_wks / len(data)) * 35.0
 
-    last4 = data[-4:] if len(data) >= 4 else data
-    slope = float(np.polyfit(range(len(last4)), last4, 1)[0]) if len(last4) > 1 else 0.0
+    if slope is None:
+        slope = trend_slope(data)
     trend_penalty = min(25.0, abs(slope) / m * 250.0) if slope < 0 else 0.0
 
     score = int(min(100, round(volatility + deficit_freq + trend_penalty)))
@@ -54,12 +67,32 @@ def moving_average(data: np.ndarray, window: int = 3) -> np.ndarray:
     return np.concatenate([pad, result])
 
 
-def get_forecast(data: np.ndarray) -> list[float]:
-    """Weighted MA + linear trend + 10% noise → 3 forecast values."""
-    weights  = np.array([0.05, 0.07, 0.09, 0.11, 0.13, 0.15, 0.18, 0.22])
-    weighted = float(np.dot(data, weights))
-    last4    = data[-4:] if len(data) >= 4 else data
-    slope    = float(np.polyfit(range(len(last4)), last4, 1)[0]) if len(last4) > 1 else 0.0
+def estimate_tokens(text: str) -> int:
+    """
+    Rough LLM token count without a tokenizer: ~4 ASCII characters per
+    token, and one token per non-ASCII character (₹, Devanagari, emoji…).
+    """
+    if not text:
+        return 0
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return (len(text) - non_ascii + 3) // 4 + non_ascii
+
+
+FORECAST_WEIGHTS = np.array([0.05, 0.07, 0.09, 0.11, 0.13, 0.15, 0.18, 0.22])
+
+
+def _weighted_level(data: np.ndarray) -> float:
+    """Weighted MA over the most recent len(FORECAST_WEIGHTS) weeks (renormalised if fewer)."""
+    n = min(len(data), len(FORECAST_WEIGHTS))
+    if n == 0:
+        return 0.0
+    weights = FORECAST_WEIGHTS[-n:]
+    if n < len(FORECAST_WEIGHTS):
+        weights = weights / weights.sum()
+    return float(np.dot(data[-n:], weights))
+
+
+def _project(weighted: float, slope: float) -> list[float]:
     forecasts = []
     for i in range(3):
         noise = 1 + (np.random.random() - 0.5) * 0.10
@@ -67,32 +100,168 @@ def get_forecast(data: np.ndarray) -> list[float]:
     return forecasts
 
 
-def build_report_context(
-    weekly_income: list,
-    worker_type: str,
-    city: str,
-    dependents: int,
-    monthly_exp: float,
-    avg_income: float,
-    risk_score: int,
-    risk_label: str,
-    forecast: float,
-    buffer_amount: float,
-    monthly_save: float,
-    buffer_weeks: int,
-) -> str:
+def get_forecast(data: np.ndarray, slope: float | None = None) -> list[float]:
+    """Weighted MA + linear trend + 10% noise → 3 forecast values."""
+    data = np.asarray(data, dtype=float)
+    if slope is None:
+        slope = trend_slope(data)
+    return _project(_weighted_level(data), slope)
+
+
+def forecast_bands(
+    data: np.ndarray,
+    n_paths: int = 5000,
+    seed: int | None = 0,
+    slope: float | None = None,
+) -> dict[str, list[float]]:
+    """
+    Monte Carlo version of get_forecast → p10/p50/p90 for the next 3 weeks.
+    All paths are drawn in one call from a seeded Generator, so the same
+    history and seed always give the same bands. Each path follows the
+    weighted-MA + trend line with multiplicative shocks sized by the
+    history's coefficient of variation, accumulated week over week so the
+    band widens with the horizon.
+    """
+    data = np.asarray(data, dtype=float)
+    if slope is None:
+        slope = trend_slope(data)
+    level = _weighted_level(data)
+    m     = float(np.mean(data)) if len(data) else 0.0
+    cv    = float(np.std(data)) / m if m > 0 else 0.0
+
+    rng    = np.random.default_rng(seed)
+    steps  = np.arange(1, 4)
+    shocks = np.cumsum(rng.standard_normal((n_paths, 3)), axis=1) * cv
+    paths  = np.maximum(0.0, (level + slope * 1.5 * steps) * (1.0 + shocks))
+    p10, p50, p90 = np.percentile(paths, [10, 50, 90], axis=0)
+    return {
+        "p10": [round(float(v), 2) for v in p10],
+        "p50": [round(float(v), 2) for v in p50],
+        "p90": [round(float(v), 2) for v in p90],
+    }
+
+
+class OnlineForecaster:
+    """
+    Incremental version of get_forecast for long-running per-worker state.
+    Only the last len(FORECAST_WEIGHTS) weeks ever influence the forecast,
+    so that bounded window is the whole state — push() and forecast() cost
+    the same whether the worker has 8 weeks or 8 years.
+    """
+    __slots__ = ("window",)
+
+    def __init__(self, window=()):
+        self.window = [float(v) for v in window][-len(FORECAST_WEIGHTS):]
+
+    @classmethod
+    def from_history(cls, weekly_income) -> "OnlineForecaster":
+        return cls(np.asarray(weekly_income, dtype=float)[-len(FORECAST_WEIGHTS):])
+
+    def push(self, week_income: float) -> "OnlineForecaster":
+        """Append the newest week, dropping the oldest once the window is full."""
+        self.window.append(float(week_income))
+        if len(self.window) > len(FORECAST_WEIGHTS):
+            self.window.pop(0)
+        return self
+
+    @property
+    def slope(self) -> float:
+        """Closed-form least-squares slope over the last (up to) 4 weeks."""
+        last4 = self.window[-4:]
+        n = len(last4)
+        if n < 2:
+            return 0.0
+        xm = (n - 1) / 2.0
+        return sum((i - xm) * y for i, y in enumerate(last4)) / sum((i - xm) ** 2 for i in range(n))
+
+    def forecast(self) -> list[float]:
+        return _project(_weighted_level(np.array(self.window)), self.slope)
+
+    def to_state(self) -> dict:
+        return {"window": list(self.window)}
+
+    @classmethod
+    def from_state(cls, state: dict) -> "OnlineForecaster":
+        return cls(state["window"])   # older states also carry count/total; they never fed the forecast
+
+
+@dataclass(frozen=True, slots=True)
+class IncomeAnalysis:
+    """
+    Every number an analysis produces, computed once from the raw weeks.
+    The results screen, PDF, chatbot context and offline fallback all read
+    from this object instead of recomputing.
+    """
+    weekly_income  : tuple[float, ...]
+    monthly_exp    : float
+    dependents     : int
+    weekly_expense : float
+    avg_income     : float
+    slope          : float
+    deficit_weeks  : tuple[int, ...]
+    risk_score     : int
+    risk_label     : str
+    forecasts      : tuple[float, ...]
+    forecast_low   : tuple[float, ...]
+    forecast_high  : tuple[float, ...]
+    buffer_amount  : float
+    monthly_save   : float
+    buffer_weeks   : int
+
+    @classmethod
+    def from_weeks(cls, weekly_income, monthly_exp: float, dependents: int) -> "IncomeAnalysis":
+        data           = np.array(weekly_income, dtype=float)
+        weekly_expense = monthly_exp / WEEKS_PER_MONTH
+        avg_income     = float(np.mean(data)) if len(data) else 0.0
+        slope          = trend_slope(data)
+        risk_score, risk_label = calc_risk_score(data, weekly_expense, slope=slope)
+        bands          = forecast_bands(data, slope=slope)
+        buf_amt, m_save, buf_wks = calc_emergency_buffer(weekly_expense, avg_income, int(dependents))
+        return cls(
+            weekly_income=tuple(float(v) for v in data),
+            monthly_exp=float(monthly_exp),
+            dependents=int(dependents),
+            weekly_expense=weekly_expense,
+            avg_income=avg_income,
+            slope=slope,
+            deficit_weeks=tuple(int(i) + 1 for i in np.flatnonzero(data < weekly_expense)),
+            risk_score=risk_score,
+            risk_label=risk_label,
+            forecasts=tuple(bands["p50"]),
+            forecast_low=tuple(bands["p10"]),
+            forecast_high=tuple(bands["p90"]),
+            buffer_amount=buf_amt,
+            monthly_save=m_save,
+            buffer_weeks=buf_wks,
+        )
+
+    @property
+    def n_weeks(self) -> int:
+        return len(self.weekly_income)
+
+    @property
+    def forecast(self) -> float:
+        """Next-week forecast (median of the simulated paths)."""
+        return self.forecasts[0]
+
+    @property
+    def deficit_count(self) -> int:
+        return len(self.deficit_weeks)
+
+    @property
+    def trend(self) -> str:
+        """upward / downward / stable, using a ±₹100/week slope band."""
+        return "upward" if self.slope > 100 else ("downward" if self.slope < -100 else "stable")
+
+
+def build_report_context(analysis: IncomeAnalysis, worker_type: str, city: str) -> str:
     """
     Build a structured plain-text report context string to be passed
     to the chatbot as its system knowledge about this specific worker.
     """
-    weekly_expense = monthly_exp / 4.33
-    deficit_weeks  = [i + 1 for i, v in enumerate(weekly_income) if v < weekly_expense]
-    data           = np.array(weekly_income, dtype=float)
-    last4          = data[-4:]
-    slope          = float(np.polyfit(range(4), last4, 1)[0]) if len(last4) == 4 else 0
-    trend          = "upward" if slope > 100 else ("downward" if slope < -100 else "stable")
-
-    weeks_str = "\n".join(f"  Week {i+1}: ₹{v:,.0f}" for i, v in enumerate(weekly_income))
+    a             = analysis
+    deficit_weeks = list(a.deficit_weeks)
+    weeks_str     = "\n".join(f"  Week {i+1}: ₹{v:,.0f}" for i, v in enumerate(a.weekly_income))
 
     return f"""=== FinStab — WORKER ANALYSIS REPORT ===
 
@@ -100,27 +269,338 @@ WORKER PROFILE
 --------------
 Type       : {worker_type}
 City       : {city}
-Dependents : {dependents}
-Monthly Expenses : ₹{monthly_exp:,.0f}
-Weekly Expense Target : ₹{weekly_expense:,.0f}
+Dependents : {a.dependents}
+Monthly Expenses : ₹{a.monthly_exp:,.0f}
+Weekly Expense Target : ₹{a.weekly_expense:,.0f}
 
-INCOME DATA (Last 8 Weeks)
+INCOME DATA (Last {a.n_weeks} Weeks)
 --------------------------
 {weeks_str}
 
 ANALYSIS RESULTS
 ----------------
-Average Weekly Income : ₹{avg_income:,.0f}
-Next Week Forecast    : ₹{forecast:,.0f}
-Income Trend          : {trend}
-Risk Score            : {risk_score}/100 ({risk_label} risk)
-Deficit Weeks         : {deficit_weeks if deficit_weeks else "None"} ({len(deficit_weeks)} out of 8)
+Average Weekly Income : ₹{a.avg_income:,.0f}
+Next Week Forecast    : ₹{a.forecast:,.0f}
+Income Trend          : {a.trend}
+Risk Score            : {a.risk_score}/100 ({a.risk_label} risk)
+Deficit Weeks         : {deficit_weeks if deficit_weeks else "None"} ({len(deficit_weeks)} out of {a.n_weeks})
 
 EMERGENCY BUFFER PLAN
 ---------------------
-Target Emergency Fund : ₹{buffer_amount:,.0f}
-Monthly Savings Goal  : ₹{monthly_save:,.0f}/month (6-month plan)
-Weeks of Protection   : {buffer_weeks} weeks without income
+Target Emergency Fund : ₹{a.buffer_amount:,.0f}
+Monthly Savings Goal  : ₹{a.monthly_save:,.0f}/month (6-month plan)
+Weeks of Protection   : {a.buffer_weeks} weeks without income
 
 === END OF REPORT ===
 """
+
+
+def build_compact_context(
+    analysis: IncomeAnalysis, worker_type: str, city: str, worker_name: str = "",
+) -> str:
+    """
+    Same facts as build_report_context() in a dense key=value form for the
+    LLM prompts. Built once per analysis; see context_token_counts() for
+    the size difference. The name stays in so the model knows who it is
+    addressing; chat replies are cached per worker anyway, since the
+    greeting in the history carries the same name.
+    """
+    a    = analysis
+    name = f"name={worker_name.strip()}; " if worker_name and worker_name.strip() else ""
+    defs = ",".join(str(w) for w in a.deficit_weeks) or "none"
+    return (
+        f"FinStab report (amounts in INR, weekly unless noted)\n"
+        f"{name}work={worker_type}; city={city}; dependents={a.dependents}\n"
+        f"expenses/month={a.monthly_exp:.0f}; expense_target={a.weekly_expense:.0f}\n"
+        f"income_w1-w{a.n_weeks}={','.join(f'{v:.0f}' for v in a.weekly_income)}\n"
+        f"avg={a.avg_income:.0f}; trend={a.trend}; "
+        f"forecast_next3={'/'.join(f'{v:.0f}' for v in a.forecasts)} "
+        f"(p10-p90 next week {a.forecast_low[0]:.0f}-{a.forecast_high[0]:.0f})\n"
+        f"risk={a.risk_score}/100 {a.risk_label}; deficit_weeks={defs} ({a.deficit_count}/{a.n_weeks})\n"
+        f"buffer_target={a.buffer_amount:.0f}; save/month={a.monthly_save:.0f} (6-month plan); "
+        f"weeks_protected={a.buffer_weeks}"
+    )
+
+
+def context_token_counts(analysis: IncomeAnalysis, worker_type: str, city: str) -> dict[str, int]:
+    """Estimated prompt tokens of the verbose vs compact report context."""
+    return {
+        "verbose": estimate_tokens(build_report_context(analysis, worker_type, city)),
+        "compact": estimate_tokens(build_compact_context(analysis, worker_type, city)),
+    }
+
+
+# ─────────────────────────────────────────────────────────
+# COHORT (BATCH) SCORING
+# ─────────────────────────────────────────────────────────
+def _last4_slopes(data: np.ndarray) -> np.ndarray:
+    """Closed-form least-squares slope of the last (up to) 4 columns, row-wise."""
+    last4 = data[:, -4:]
+    n = last4.shape[1]
+    if n < 2:
+        return np.zeros(data.shape[0])
+    x = np.arange(n, dtype=float) - (n - 1) / 2.0
+    return (last4 @ x) / float(np.dot(x, x))
+
+
+def _near_half(values: np.ndarray, tol: float = 1e-6) -> np.ndarray:
+    """Mask of values whose fractional part sits on a rounding tie (x.5)."""
+    frac = np.abs(values - np.trunc(values))
+    return np.abs(frac - 0.5) < tol
+
+
+def score_cohort(
+    incomes: np.ndarray,
+    weekly_expense: np.ndarray,
+    dependents: np.ndarray,
+) -> dict[str, np.ndarray]:
+    """
+    Vectorized calc_risk_score + calc_emergency_buffer for a whole cohort.
+      incomes        : (N workers × W weeks) matrix
+      weekly_expense : (N,) vector (or scalar)
+      dependents     : (N,) vector (or scalar)
+    Returns a dict of (N,) arrays keyed like the app's results dict:
+    avg_income, risk_score, risk_label, buffer_amount, monthly_save, buffer_weeks.
+    Values match the scalar functions exactly — the rare rows sitting on a
+    rounding tie are re-scored with the scalar code.
+    """
+    data = np.atleast_2d(np.asarray(incomes, dtype=float))
+    n, w = data.shape
+    exp  = np.broadcast_to(np.asarray(weekly_expense, dtype=float), (n,))
+    deps = np.broadcast_to(np.asarray(dependents, dtype=int), (n,))
+
+    # ── Risk score ──
+    if w == 0:
+        m     = np.zeros(n)
+        score = np.zeros(n, dtype=int)
+    else:
+        m     = data.mean(axis=1)
+        s     = data.std(axis=1)
+        safe  = np.where(m == 0, 1.0, m)
+        volatility   = np.minimum(40.0, (s / safe) * 80.0)
+        deficit_freq = (data < exp[:, None]).sum(axis=1) / w * 35.0
+        slope        = _last4_slopes(data)
+        trend        = np.where(slope < 0, np.minimum(25.0, np.abs(slope) / safe * 250.0), 0.0)
+        raw          = volatility + deficit_freq + trend
+        score        = np.minimum(100, np.round(raw)).astype(int)
+        score[m == 0] = 100
+        for i in np.flatnonzero(_near_half(raw) & (m != 0)):
+            score[i] = calc_risk_score(data[i], float(exp[i]))[0]
+    label = np.where(score < 35, "LOW", np.where(score < 65, "MEDIUM", "HIGH"))
+
+    # ── Emergency buffer ──
+    buffer_weeks  = np.minimum(8, 4 + deps)
+    shortfall     = np.maximum(0.0, exp - m)
+    buffer_raw    = (exp * buffer_weeks) + (shortfall * buffer_weeks * 0.5)
+    save_raw      = buffer_raw / 6.0
+    buffer_amount = np.round(buffer_raw, 2)
+    monthly_save  = np.round(save_raw, 2)
+    for i in np.flatnonzero(_near_half(buffer_raw * 100) | _near_half(save_raw * 100)):
+        buffer_amount[i], monthly_save[i], _ = calc_emergency_buffer(
+            float(exp[i]), float(m[i]), int(deps[i]))
+
+    return {
+        "avg_income":    m,
+        "risk_score":    score,
+        "risk_label":    label,
+        "buffer_amount": buffer_amount,
+        "monthly_save":  monthly_save,
+        "buffer_weeks":  buffer_weeks,
+    }
+
+
+# ─────────────────────────────────────────────────────────
+# DAILY ROLLING ANALYTICS
+# ─────────────────────────────────────────────────────────
+DAYS_PER_WEEK = 7
+
+
+class DailyRolling:
+    """
+    Rolling metrics over a worker's last `window` days of earnings, updated
+    in O(1) per day from running sums: mean, volatility (std / mean, as in
+    calc_risk_score) and the share of days below the daily expense target.
+    Days roll up into weekly totals; a week is closed as soon as its last
+    day is pushed and then feeds risk() and forecast(), which agree exactly
+    with calc_risk_score() and get_forecast() on weekly_totals() of the same
+    days.
+
+    Pass the date to push() to use ISO weeks (Monday–Sunday, missing days
+    count as 0, a partial first week is skipped); without dates every 7
+    pushes make a week.
+    """
+    __slots__ = ("window", "weekly_expense", "_days", "_sum", "_sumsq", "_deficit", "_since_resync",
+                 "last_day", "_week_days", "_week_total", "weekly", "forecaster")
+
+    def __init__(self, monthly_exp: float, window: int = 28, weeks: int = 8):
+        self.window         = int(window)
+        self.weekly_expense = monthly_exp / WEEKS_PER_MONTH
+        self._days          = deque(maxlen=self.window)
+        self._sum           = 0.0
+        self._sumsq         = 0.0
+        self._deficit       = 0
+        self._since_resync  = 0
+        self.last_day       = None
+        self._week_days     = 0
+        self._week_total    = 0.0
+        self.weekly         = deque(maxlen=int(weeks))
+        self.forecaster     = OnlineForecaster()
+
+    @property
+    def daily_expense(self) -> float:
+        return self.weekly_expense / DAYS_PER_WEEK
+
+    # ── updates ──
+    def push(self, amount: float, day=None) -> "DailyRolling":
+        """Add one day's earnings (in date order when dates are given)."""
+        if day is not None:
+            if self.last_day is not None:
+                gap = (day - self.last_day).days
+                if gap <= 0:
+                    raise ValueError(f"days must be pushed in order ({day} after {self.last_day})")
+                for i in range(1, gap):
+                    self._add_day(0.0, self.last_day + dt.timedelta(days=i))
+            self._add_day(float(amount), day)
+            self.last_day = day
+        else:
+            self._add_day(float(amount), None)
+        return self
+
+    def _add_day(self, amount: float, day):
+        if len(self._days) == self.window:
+            old = self._days[0]
+            self._sum     -= old
+            self._sumsq   -= old * old
+            self._deficit -= old < self.daily_expense
+        self._days.append(amount)
+        self._sum     += amount
+        self._sumsq   += amount * amount
+        self._deficit += amount < self.daily_expense
+        self._since_resync += 1
+        if self._since_resync >= self.window:   # bound float drift; amortised O(1)
+            self._sum   = float(sum(self._days))
+            self._sumsq = float(sum(v * v for v in self._days))
+            self._since_resync = 0
+
+        self._week_days  += 1
+        self._week_total += amount
+        if day.weekday() == 6 if day is not None else self._week_days == DAYS_PER_WEEK:
+            self._close_week()
+
+    def _close_week(self):
+        # A dated history starting mid-week has a partial first week; it is not a weekly total
+        if self._week_days == DAYS_PER_WEEK:
+            self.weekly.append(self._week_total)
+            self.forecaster.push(self._week_total)
+        self._week_days, self._week_total = 0, 0.0
+
+    # ── rolling daily metrics ──
+    @property
+    def n_days(self) -> int:
+        return len(self._days)
+
+    @property
+    def mean(self) -> float:
+        return self._sum / len(self._days) if self._days else 0.0
+
+    @property
+    def std(self) -> float:
+        """Population std (ddof=0), matching np.std."""
+        n = len(self._days)
+        if not n:
+            return 0.0
+        m = self._sum / n
+        return float(np.sqrt(max(0.0, self._sumsq / n - m * m)))
+
+    @property
+    def volatility(self) -> float:
+        """Coefficient of variation over the window (0.0 when the mean is 0)."""
+        m = self.mean
+        return self.std / m if m > 0 else 0.0
+
+    @property
+    def deficit_rate(self) -> float:
+        """Share of days in the window earning below the daily expense target."""
+        return self._deficit / len(self._days) if self._days else 0.0
+
+    # ── weekly roll-up ──
+    @property
+    def week_to_date(self) -> float:
+        return self._week_total
+
+    def risk(self) -> tuple[int, str]:
+        """calc_risk_score() over the completed weeks kept in `weekly`."""
+        return calc_risk_score(np.array(self.weekly, dtype=float), self.weekly_expense)
+
+    def forecast(self) -> list[float]:
+        """get_forecast() over every completed week pushed so far."""
+        return self.forecaster.forecast()
+
+    def to_state(self) -> dict:
+        return {"window": self.window, "monthly_exp": self.weekly_expense * WEEKS_PER_MONTH,
+                "weeks": self.weekly.maxlen, "days": list(self._days),
+                "last_day": self.last_day.isoformat() if self.last_day else None,
+                "week_days": self._week_days, "week_total": self._week_total,
+                "weekly": list(self.weekly), "forecaster": self.forecaster.to_state()}
+
+    @classmethod
+    def from_state(cls, state: dict) -> "DailyRolling":
+        r = cls(state["monthly_exp"], state["window"], state["weeks"])
+        r._days.extend(state["days"])
+        r._sum     = float(sum(r._days))
+        r._sumsq   = float(sum(v * v for v in r._days))
+        r._deficit = sum(v < r.daily_expense for v in r._days)
+        r.last_day = dt.date.fromisoformat(state["last_day"]) if state["last_day"] else None
+        r._week_days   = state["week_days"]
+        r._week_total  = state["week_total"]
+        r.weekly.extend(state["weekly"])
+        r.forecaster = OnlineForecaster.from_state(state["forecaster"])
+        return r
+
+
+def rolling_daily(daily, window: int, daily_expense) -> dict[str, np.ndarray]:
+    """
+    Batch version of DailyRolling's metrics for whole histories: `daily` is a
+    (days,) series or an (N workers × days) matrix; returns arrays of the same
+    shape with the mean, std, volatility and deficit_rate of each trailing
+    window (shorter at the start, as while a DailyRolling fills up). Built on
+    cumulative sums, so cost is linear in the number of days.
+    """
+    data = np.atleast_2d(np.asarray(daily, dtype=float))
+    exp  = np.asarray(daily_expense, dtype=float).reshape(-1, 1) if np.ndim(daily_expense) else daily_expense
+    n, d = data.shape
+
+    def trailing(x):
+        c = np.concatenate([np.zeros((n, 1)), np.cumsum(x, axis=1)], axis=1)
+        return c[:, 1:] - c[:, np.maximum(0, np.arange(1, d + 1) - window)]
+
+    count   = np.minimum(np.arange(1, d + 1), window).astype(float)
+    mean    = trailing(data) / count
+    std     = np.sqrt(np.maximum(0.0, trailing(data * data) / count - mean * mean))
+    deficit = trailing((data < exp).astype(float)) / count
+    vol     = np.divide(std, mean, out=np.zeros_like(std), where=mean > 0)
+    out     = {"mean": mean, "std": std, "volatility": vol, "deficit_rate": deficit}
+    return {k: v[0] for k, v in out.items()} if np.ndim(daily) == 1 else out
+
+
+def weekly_totals(daily, days=None) -> np.ndarray:
+    """
+    Daily earnings → totals of complete weeks, as DailyRolling rolls them up.
+    With `days` (dates), weeks are ISO weeks (Monday–Sunday) and missing days
+    inside the span count as 0; a first week starting after Monday or a last
+    week ending before Sunday is left out. Without dates, weeks are
+    consecutive blocks of 7 and a trailing partial block is left out.
+    """
+    data = np.asarray(daily, dtype=float)
+    if days is None:
+        full = len(data) // DAYS_PER_WEEK * DAYS_PER_WEEK
+        return data[:full].reshape(-1, DAYS_PER_WEEK).sum(axis=1)
+    if not len(data):
+        return np.zeros(0)
+    ords   = np.array([d.toordinal() for d in days])
+    monday = ords - np.array([d.weekday() for d in days])
+    week   = (monday - monday.min()) // DAYS_PER_WEEK
+    totals = np.bincount(week, weights=data)
+    first  = 0 if (ords.min() - monday.min()) == 0 else 1
+    last   = len(totals) if ords.max() - monday.max() == DAYS_PER_WEEK - 1 else len(totals) - 1
+    return totals[first:last]